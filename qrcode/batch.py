@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Encodes many payloads at once, over a pool of worker processes."""
+
+from multiprocessing import Pool, cpu_count
+from threading import Semaphore
+
+from qrcode import Encoder
+from qrdraw import QUIET_ZONE_WIDTH, warm_templates
+
+#: Encoding options of the current worker process, set by _init_worker.
+_WORKER_OPTIONS = ()
+
+#: Chunks per worker read by encode_many ahead of the results yielded.
+IN_FLIGHT_CHUNKS = 4
+
+
+def encode_one(payload, ecl='L', mask_policy='exhaustive', format=None,
+        zoom=5, border=QUIET_ZONE_WIDTH):
+    """Encodes a payload and returns its
+    :class:`qrcode.matrix.PackedMatrix`, or its image as a string if a
+    format is given (see :func:`qrcode.render.render_symbol`)."""
+    code = Encoder(payload, ecl, mask_policy)
+    if format is None:
+        return code.make_matrix()
+    return code.render(format=format, zoom=zoom, border=border)
+
+
+def _init_worker(*options):
+    """Pool initializer: keeps the encoding options and builds the symbol
+    templates. Other per version caches fill on first use and, workers being
+    long lived, stay warm for the following payloads."""
+    global _WORKER_OPTIONS
+    _WORKER_OPTIONS = options
+    warm_templates()
+
+
+def _encode(payload):
+    """Encodes a payload in a worker process."""
+    return encode_one(payload, *_WORKER_OPTIONS)
+
+
+def _encode_indexed(item):
+    """Encodes an (index, payload) pair in a worker process."""
+    index, payload = item
+    return index, encode_one(payload, *_WORKER_OPTIONS)
+
+
+def encode_many(payloads, ecl='L', workers=None, chunksize=64, ordered=True,
+        mask_policy='exhaustive', format=None, zoom=5,
+        border=QUIET_ZONE_WIDTH):
+    """Encodes an iterable of payloads and yields the results as they come,
+    see :func:`encode_one`: packed matrices, or images as strings if a format
+    is given.
+
+    :param workers: the number of worker processes, the number of CPUs by
+                    default; with 1 payloads are encoded in this process
+    :param chunksize: payloads sent to a worker at a time
+    :param ordered: yield results in the order of payloads; otherwise yield
+                    (index, result) pairs as soon as they are ready, index
+                    being the position of the payload in payloads
+
+    At most IN_FLIGHT_CHUNKS chunks per worker are read from payloads ahead
+    of the results yielded: a new payload is read as each result is yielded,
+    so that workers stay busy while memory does not grow with the number of
+    payloads.
+
+    >>> [matrix.side for matrix in encode_many(['HELLO', 'A' * 100],
+    ...     workers=1)]
+    [21, 33]
+
+    """
+    options = (ecl, mask_policy, format, zoom, border)
+    if workers == 1:
+        for index, payload in enumerate(payloads):
+            result = encode_one(payload, *options)
+            yield result if ordered else (index, result)
+        return
+    workers = workers or cpu_count()
+    in_flight = Semaphore(workers * chunksize * IN_FLIGHT_CHUNKS)
+    stopped = []
+
+    def feed():
+        # run by the pool task handler thread
+        for index, payload in enumerate(payloads):
+            in_flight.acquire()
+            if stopped:
+                return
+            yield payload if ordered else (index, payload)
+
+    pool = Pool(workers, _init_worker, options)
+    try:
+        if ordered:
+            results = pool.imap(_encode, feed(), chunksize)
+        else:
+            results = pool.imap_unordered(_encode_indexed, feed(), chunksize)
+        for result in results:
+            in_flight.release()
+            yield result
+        pool.close()
+    finally:
+        # wake up feed if it waits, so that the task handler can stop
+        stopped.append(True)
+        in_flight.release()
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""A growable buffer of bits used to build the qrcode data bit stream."""
+
+#: 8 characters bit strings for every byte value, used for the string view.
+BYTE_BIT_STRINGS = [''.join(str((byte >> i) & 1) for i in range(7, -1, -1))
+        for byte in range(256)]
+
+
+class BitBuffer(object):
+    """A sequence of bits packed, most significant bit first, in a bytearray.
+
+    >>> buf = BitBuffer()
+    >>> buf.append(1, 4)
+    >>> buf.append(8, 10)
+    >>> len(buf), str(buf)
+    (14, '00010000001000')
+    >>> buf.pad_to_byte()
+    >>> list(buf.to_bytes())
+    [16, 32]
+
+    """
+    __slots__ = ('data', 'length')
+
+    def __init__(self):
+        self.data = bytearray()
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return self.to_binstring()
+
+    def __repr__(self):
+        return "BitBuffer(" + self.to_binstring() + ")"
+
+    def append(self, value, length):
+        """Append the *length* least significant bits of value."""
+        value &= (1 << length) - 1
+        free = -self.length % 8
+        if free:
+            taken = min(free, length)
+            length -= taken
+            self.data[-1] |= (value >> length) << (free - taken)
+            value &= (1 << length) - 1
+            self.length += taken
+        while length >= 8:
+            length -= 8
+            self.data.append((value >> length) & 0xff)
+            self.length += 8
+        if length:
+            self.data.append((value << (8 - length)) & 0xff)
+            self.length += length
+
+    def append_bytes(self, data):
+        """Append a sequence of 8 bit values."""
+        if self.length % 8:
+            for byte in data:
+                self.append(byte, 8)
+        else:
+            self.data.extend(data)
+            self.length += 8 * len(data)
+
+    def pad_to_byte(self):
+        """Add zeroes up to the next multiple of 8 bits."""
+        self.length = 8 * len(self.data)
+
+    def to_bytes(self):
+        """Returns a copy of the buffer content as a bytearray, the last byte
+        being padded with zeroes."""
+        return bytearray(self.data)
+
+    def to_binstring(self, length=None):
+        """Returns the first *length* bits, all of them by default, as a string
+        of '0' and '1'. Meant for debugging and tests."""
+        if length is None:
+            length = self.length
+        return ''.join(BYTE_BIT_STRINGS[byte] for byte in
+                self.data[:(length + 7) // 8])[:length]
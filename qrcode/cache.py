@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""A bounded cache of rendered symbols, for services rendering the same
+payloads over and over."""
+
+from collections import OrderedDict
+from threading import Lock
+
+from qrcode import Encoder
+from qrdraw import QUIET_ZONE_WIDTH
+
+
+class RenderCache(object):
+    """A thread-safe least recently used cache of rendered images, keyed by
+    (payload, error correction level, mask policy, format, zoom, quiet zone).
+
+    :param max_entries: the most images kept
+    :param max_bytes: the most bytes of images kept; an image larger than
+                      that is rendered but never kept
+
+    Rendering happens outside the lock, so that threads missing different
+    keys do not wait for each other; two threads missing the same key at once
+    both render it. Encoding is itself safe to run from several threads.
+
+    >>> cache = RenderCache(max_entries=2)
+    >>> png = cache.render('HELLO', 'M')
+    >>> cache.render('HELLO', 'M') is png
+    True
+    >>> cache.hits, cache.misses, cache.evictions
+    (1, 1, 0)
+
+    """
+    def __init__(self, max_entries=1024, max_bytes=64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def render(self, payload, error_correction_level='L',
+            mask_policy='exhaustive', format='png', zoom=5,
+            border=QUIET_ZONE_WIDTH):
+        """Returns the image of payload as a string, as
+        :meth:`qrcode.qrcode.Encoder.render` would, from the cache if it is
+        there."""
+        key = (payload, error_correction_level, mask_policy, format, zoom,
+                border)
+        with self.lock:
+            data = self.entries.pop(key, None)
+            if data is not None:
+                self.entries[key] = data
+                self.hits += 1
+                return data
+            self.misses += 1
+        data = Encoder(payload, error_correction_level, mask_policy).render(
+                format=format, zoom=zoom, border=border)
+        self.store(key, data)
+        return data
+
+    def store(self, key, data):
+        """Keeps data under key as the most recently used entry, evicting the
+        least recently used ones beyond the limits."""
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= len(previous)
+            self.entries[key] = data
+            self.nbytes += len(data)
+            while (len(self.entries) > self.max_entries or
+                    self.nbytes > self.max_bytes):
+                _key, evicted = self.entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Drops every entry; counters are kept."""
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
@@ -1,6 +1,12 @@
 #!/usr/bin/python
 """Handles Galois Field calculation."""
 
+from collections import OrderedDict
+from threading import Lock
+
+#: Maximum number of generator polynomials kept by each GaloisField.
+GENERATOR_CACHE_SIZE = 32
+
 class GaloisField(object):
     """Raw representation of a Galois Field and its algebric operations."""
     def __init__(self, galois_field=256, primitive_polynomial_as_int=285):
@@ -9,6 +15,11 @@ class GaloisField(object):
         self.log = [0] * self.field
         self.alog = [0] * self.field
         self.fill_log_arrays()
+        self.products = bytearray(self.field * self.field)
+        self.inverses = bytearray(self.field)
+        self.fill_product_tables()
+        self.generators = OrderedDict()
+        self.generators_lock = Lock()
 
     def fill_log_arrays(self):
         """Fills log and alog dicts."""
@@ -20,6 +31,21 @@ class GaloisField(object):
                 self.alog[i] ^= self.primitive_poly
             self.log[self.alog[i]] = i
 
+    def fill_product_tables(self):
+        """Fills the products and inverses tables.
+
+        The product of op1 and op2 is stored at index op1 * field + op2 of
+        products, so that multiplication and division need no log arithmetic.
+        The inverse of 0 is undefined and left to 0."""
+        order = self.field - 1
+        for op1 in range(1, self.field):
+            log1 = self.log[op1]
+            row = op1 * self.field
+            self.products[row + 1:row + self.field] = bytearray(
+                    self.alog[(log1 + self.log[op2]) % order]
+                    for op2 in range(1, self.field))
+            self.inverses[op1] = self.alog[(order - log1) % order]
+
     def add(self, op1, op2):
         """Sum operation in a Galois Field."""
         return int(op1) ^ int(op2)
@@ -30,10 +56,7 @@ class GaloisField(object):
 
     def multiply(self, op1, op2):
         """Multiply two numbers in a Galois Field."""
-        if (op1 == 0) or (op2 == 0):
-            return 0
-        else:
-            return self.alog[(self.log[op1] + self.log[op2]) % (self.field - 1)]
+        return self.products[op1 * self.field + op2]
 
     def alpha_power(self, num):
         """Power of a number in a Galois Field."""
@@ -49,15 +72,50 @@ class GaloisField(object):
         """Multiplicative inverse of num"""
         if num == 0:
             raise Exception("InvalidArgument")
-        return self.alog[255 - self.log[num]]
+        return self.inverses[num]
 
     def quotient(self, op1, op2):
         """Divide two numbers in a Galois Field."""
         if op2 == 0:
             raise Exception("b must be != 0")
         else:
-            return self.alog[(self.log[op1] -
-                self.log[op2] + (self.field - 1)) % (self.field - 1)]
+            return self.products[op1 * self.field + self.inverses[op2]]
+
+    def generator_polynomial(self, degree):
+        """Returns the Reed-Solomon generator polynomial of a given degree,
+        (x - a^0)(x - a^1)...(x - a^(degree - 1)), as a tuple of alpha
+        exponents in descending power order.
+
+        Polynomials are computed on first use and the last
+        GENERATOR_CACHE_SIZE ones are kept; the cache may be shared by
+        several threads.
+
+        >>> GaloisField().generator_polynomial(7)
+        (0, 87, 229, 146, 149, 238, 102, 21)
+
+        """
+        with self.generators_lock:
+            try:
+                exponents = self.generators.pop(degree)
+            except KeyError:
+                exponents = self._generator_exponents(degree)
+                if len(self.generators) >= GENERATOR_CACHE_SIZE:
+                    self.generators.popitem(last=False)
+            self.generators[degree] = exponents
+        return exponents
+
+    def _generator_exponents(self, degree):
+        """Computes the exponents of a generator polynomial, see
+        generator_polynomial."""
+        if not 0 < degree < self.field - 1:
+            raise Exception("Degree must be between 1 and %d" %
+                    (self.field - 2))
+        coefficients = [1]
+        for power in range(degree):
+            root = self.alog[power]
+            coefficients = [x ^ self.multiply(root, y) for x, y in
+                    zip(coefficients + [0], [0] + coefficients)]
+        return tuple(self.log[x] % (self.field - 1) for x in coefficients)
 
     def build_monomial(self, degree, coefficient):
         """Given a degree and its coefficient returns a GFPoly in the Galois
@@ -222,3 +280,155 @@ class GFPoly(object):
 
         return GFPoly(self.field, product)
 
+
+
+class CompactGFPoly(object):
+    """A polynomial in a GF256 Field with coefficients held in a bytearray.
+
+    It has the same interface as GFPoly, but relies on the field product
+    tables and works in place: ``+=`` and ``*=`` update the instance, and the
+    inner loops of multiplication, division and evaluation only index
+    bytearrays."""
+    __slots__ = ('field', 'coefficients')
+
+    def __init__(self, field, coefficients):
+        self.field = field
+        self.coefficients = bytearray(coefficients) or bytearray(1)
+        self._strip()
+
+    def __str__(self):
+        return "CompactGFPoly(" + str(list(self.coefficients)) + ")"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _strip(self):
+        """Remove leading zero coefficients, keeping at least one."""
+        coefficients = self.coefficients
+        first_non_zero = 0
+        while (first_non_zero < len(coefficients) - 1 and
+                coefficients[first_non_zero] == 0):
+            first_non_zero += 1
+        if first_non_zero:
+            del coefficients[:first_non_zero]
+
+    def _copy(self):
+        """Returns a new CompactGFPoly with a copy of the coefficients."""
+        return CompactGFPoly(self.field, self.coefficients)
+
+    def __iadd__(self, other):
+        if self.field != other.field:
+            raise Exception("GFPolys do not have same Galois Field")
+        coefficients = self.coefficients
+        diff = len(other.coefficients) - len(coefficients)
+        if diff > 0:
+            coefficients[0:0] = bytearray(diff)
+        offset = len(coefficients) - len(other.coefficients)
+        for i, coeff in enumerate(other.coefficients):
+            coefficients[offset + i] ^= coeff
+        self._strip()
+        return self
+
+    def __add__(self, other):
+        result = self._copy()
+        result += other
+        return result
+
+    def __imul__(self, other):
+        if self.field != other.field:
+            raise Exception("GFPolys do not have same Galois Field")
+        if self.is_zero() or other.is_zero():
+            self.coefficients = bytearray(1)
+            return self
+
+        size = self.field.field
+        products = self.field.products
+        b_coefficients = other.coefficients
+        b_length = len(b_coefficients)
+        product = bytearray(len(self.coefficients) + b_length - 1)
+
+        for i, a_coeff in enumerate(self.coefficients):
+            if a_coeff:
+                row = a_coeff * size
+                for j in range(b_length):
+                    product[i + j] ^= products[row + b_coefficients[j]]
+
+        self.coefficients = product
+        return self
+
+    def __mul__(self, other):
+        result = self._copy()
+        result *= other
+        return result
+
+    def __div__(self, other):
+        if self.field != other.field:
+            raise Exception("GFPolys do not have same Galois Field")
+        if other.is_zero():
+            raise Exception("Cannot divide by 0")
+
+        remainder = bytearray(self.coefficients)
+        denominator = other.coefficients
+        den_length = len(denominator)
+        steps = len(remainder) - den_length + 1
+        if steps <= 0:
+            return CompactGFPoly(self.field, [0]), self._copy()
+
+        size = self.field.field
+        products = self.field.products
+        inverse_den_leading_term = self.field.inverses[denominator[0]]
+        quotient = bytearray(steps)
+
+        for i in range(steps):
+            coeff = remainder[i]
+            if coeff:
+                scale = products[coeff * size + inverse_den_leading_term]
+                quotient[i] = scale
+                row = scale * size
+                for j in range(den_length):
+                    remainder[i + j] ^= products[row + denominator[j]]
+
+        return (CompactGFPoly(self.field, quotient),
+                CompactGFPoly(self.field, remainder[steps:]))
+
+    def get_coefficients(self):
+        """Return a bytearray containing CompactGFPoly's coefficients."""
+        return self.coefficients
+
+    def get_degree(self):
+        """Returns the CompactGFPoly's degree."""
+        return len(self.coefficients) - 1
+
+    def is_zero(self):
+        """Returns true if CompactGFPoly's coefficients is equal to 0."""
+        return self.coefficients[0] == 0
+
+    def get_coefficient(self, degree):
+        """Returns the cooefficient of the CompactGFPoly's at a given
+        degree."""
+        return self.coefficients[len(self.coefficients) - 1 - degree]
+
+    def evaluate_at(self, point):
+        """Evaluates the polynomial at a given point with Horner's rule."""
+        size = self.field.field
+        products = self.field.products
+        result = 0
+        for coeff in self.coefficients:
+            result = products[result * size + point] ^ coeff
+        return result
+
+    def multiply_by_monomial(self, degree, coefficient):
+        """Returns a new CompactGFPoly obtained multiplying instance by a
+        monomial of given degree and coefficient."""
+        if degree < 0:
+            raise Exception("Degree must be positive")
+
+        if coefficient == 0:
+            return CompactGFPoly(self.field, [0])
+        row = coefficient * self.field.field
+        products = self.field.products
+        product = bytearray(len(self.coefficients) + degree)
+        for i, coeff in enumerate(self.coefficients):
+            product[i] = products[row + coeff]
+
+        return CompactGFPoly(self.field, product)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""A compact representation of finished QR Code symbols."""
+
+from numpy import array_equal, frombuffer, packbits, uint8, unpackbits, zeros
+
+from qrdraw import dark_modules, function_mask, symbol_version_from_size
+
+
+class PackedMatrix(object):
+    """A finished symbol held as rows of bit-packed modules, 1 being dark.
+
+    A version 40 symbol takes 177 rows of 23 bytes. Which modules are
+    function patterns is not stored: it only depends on the version and is
+    available from :meth:`function_modules`.
+
+    :param side: the length of the side of the symbol
+    :param rows: a (side, (side + 7) // 8) uint8 array as made by
+                 numpy.packbits
+    """
+    __slots__ = ('side', 'rows')
+
+    def __init__(self, side, rows):
+        self.side = side
+        self.rows = rows
+
+    @classmethod
+    def from_array(cls, symbol_array):
+        """Packs a symbol array as returned by
+        :func:`qrcode.qrdraw.make_array`."""
+        return cls(symbol_array.shape[0],
+                packbits(dark_modules(symbol_array), axis=1))
+
+    @classmethod
+    def from_bytes(cls, side, data):
+        """Rebuilds a PackedMatrix from the output of :meth:`tobytes`."""
+        rows = frombuffer(bytes(data), dtype=uint8).reshape(side, -1)
+        return cls(side, rows.copy())
+
+    def __reduce__(self):
+        # pickled as the packed rows only, e.g. between processes
+        return _unpickle, (self.side, self.tobytes())
+
+    def __eq__(self, other):
+        return (isinstance(other, PackedMatrix) and self.side == other.side and
+                array_equal(self.rows, other.rows))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "PackedMatrix(version %d)" % self.symbol_version
+
+    @property
+    def symbol_version(self):
+        """The symbol version."""
+        return symbol_version_from_size(self.side)
+
+    @property
+    def nbytes(self):
+        """Bytes used by the packed rows."""
+        return self.rows.nbytes
+
+    def dark(self):
+        """Returns a (side, side) boolean array of the dark modules."""
+        return unpackbits(self.rows, axis=1)[:, :self.side].astype(bool)
+
+    def function_modules(self):
+        """Returns the cached boolean array of the function modules of the
+        symbol version."""
+        return function_mask(self.symbol_version)
+
+    def scaled_rows(self, zoom=1, border=0):
+        """Yields the pixel rows of the symbol, each module being a zoom x zoom
+        square and the symbol surrounded by border light modules, as
+        (row, count) pairs: row is a uint8 array of packed pixels, 1 being
+        dark and the last byte padded with zeroes, repeated on count
+        consecutive pixel rows.
+
+        Only one pixel row is held in memory at a time.
+
+        >>> matrix = PackedMatrix(2, packbits([[1, 0], [0, 1]], axis=1))
+        >>> [(row.tolist(), count) for row, count in matrix.scaled_rows(2, 1)]
+        [([0], 2), ([48], 2), ([12], 2), ([0], 2)]
+
+        """
+        width = self.side + 2 * border
+        if border:
+            blank = zeros((width * zoom + 7) // 8, dtype=uint8)
+            yield blank, border * zoom
+        padded = zeros(width, dtype=bool)
+        for row in self.dark():
+            padded[border:border + self.side] = row
+            yield packbits(padded.repeat(zoom)), zoom
+        if border:
+            yield blank, border * zoom
+
+    def tobytes(self):
+        """Returns the packed rows as a string, each row padded to a whole
+        byte."""
+        return self.rows.tostring()
+
+
+def _unpickle(side, data):
+    """Rebuilds a pickled PackedMatrix."""
+    return PackedMatrix.from_bytes(side, data)
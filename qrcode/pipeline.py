@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Renders many symbols with encoding and output overlapped: the calling
+thread encodes payloads into symbol arrays while a pool of threads
+compresses and writes the images.
+
+zlib and file writes release the GIL, so that several cores are kept busy
+in a single process; a bounded queue between the two stages stops encoding
+from running ahead of the writers."""
+
+from Queue import Queue
+from threading import Thread
+
+from qrcode import Encoder
+from qrdraw import QUIET_ZONE_WIDTH, make_array
+from render import render_symbol
+
+#: Queued after the last symbol, once per writer thread.
+_DONE = object()
+
+
+def write_symbol(symbol_array, output, format='png', zoom=5,
+        border=QUIET_ZONE_WIDTH):
+    """Writes a symbol array to output, a path or anything accepted by
+    :func:`qrcode.render.render_symbol`."""
+    if isinstance(output, basestring):
+        with open(output, 'wb') as output_file:
+            render_symbol(symbol_array, output_file, format, zoom, border)
+    else:
+        render_symbol(symbol_array, output, format, zoom, border)
+
+
+def render_many(jobs, format='png', ecl='L', mask_policy='exhaustive',
+        zoom=5, border=QUIET_ZONE_WIDTH, threads=4, queue_size=None):
+    """Renders (payload, output) jobs and returns how many were written.
+
+    :param jobs: an iterable of (payload, output) pairs, output being a path
+                 or a writable object, see :func:`write_symbol`
+    :param threads: the number of writer threads
+    :param queue_size: the most symbols encoded but not yet written, twice
+                       the number of threads by default; encoding waits when
+                       the queue is full
+
+    If a write fails, no further payload is encoded and the first error is
+    raised once the writer threads are done.
+    """
+    queue = Queue(queue_size or 2 * threads)
+    errors = []
+
+    def writer():
+        while True:
+            item = queue.get()
+            if item is _DONE:
+                return
+            if errors:
+                # keep draining, so that encoding never waits forever
+                continue
+            symbol_array, output = item
+            try:
+                write_symbol(symbol_array, output, format, zoom, border)
+            except Exception as error:
+                errors.append(error)
+
+    writers = [Thread(target=writer) for _thread in range(threads)]
+    for thread in writers:
+        thread.daemon = True
+        thread.start()
+    count = 0
+    try:
+        for payload, output in jobs:
+            if errors:
+                break
+            queue.put((make_array(Encoder(payload, ecl, mask_policy)), output))
+            count += 1
+    finally:
+        for thread in writers:
+            queue.put(_DONE)
+        for thread in writers:
+            thread.join()
+    if errors:
+        raise errors[0]
+    return count
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""A PNG writer for finished symbols which needs neither PIL nor the whole
+image in memory: 1-bit grayscale scanlines are made from the rows of a
+:class:`qrcode.matrix.PackedMatrix` and compressed as they are produced."""
+
+import struct
+import zlib
+
+from qrdraw import QUIET_ZONE_WIDTH
+
+#: The eight bytes every PNG file starts with.
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+#: Compressed bytes gathered before an IDAT chunk is written.
+IDAT_SIZE = 1 << 16
+
+
+def png_chunk(chunk_type, data):
+    """Returns a PNG chunk: length, type, data and CRC.
+
+    >>> png_chunk(b'IEND', b'')
+    '\\x00\\x00\\x00\\x00IEND\\xaeB`\\x82'
+
+    """
+    return (struct.pack('>I', len(data)) + chunk_type + data +
+            struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+
+def write_png(matrix, output, zoom=1, border=QUIET_ZONE_WIDTH,
+        compression=6):
+    """Writes a symbol as a 1-bit grayscale PNG image.
+
+    :param matrix: a :class:`qrcode.matrix.PackedMatrix`
+    :param output: a file-like object open for binary writing
+    :param zoom: the side of a module in pixels
+    :param border: the width of the quiet zone in modules
+    :param compression: the zlib compression level
+
+    Memory use only depends on the width of the image: every pixel row is
+    compressed as soon as it is made and the compressed data is written in
+    IDAT chunks of about IDAT_SIZE bytes.
+    """
+    side = (matrix.side + 2 * border) * zoom
+    output.write(PNG_SIGNATURE)
+    # width, height, bit depth 1, color type 0 (grayscale), compression,
+    # filter and interlace methods 0
+    output.write(png_chunk(b'IHDR',
+        struct.pack('>IIBBBBB', side, side, 1, 0, 0, 0, 0)))
+    compressor = zlib.compressobj(compression)
+    pending = []
+    pending_size = 0
+    for row, count in matrix.scaled_rows(zoom, border):
+        # filter type 0, then the pixels: in grayscale 0 is black
+        scanline = b'\x00' + (~row).tostring()
+        for _count in range(count):
+            data = compressor.compress(scanline)
+            if data:
+                pending.append(data)
+                pending_size += len(data)
+                if pending_size >= IDAT_SIZE:
+                    output.write(png_chunk(b'IDAT', b''.join(pending)))
+                    pending = []
+                    pending_size = 0
+    pending.append(compressor.flush())
+    output.write(png_chunk(b'IDAT', b''.join(pending)))
+    output.write(png_chunk(b'IEND', b''))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Writes finished symbols as binary Netpbm images, straight from the rows
+of a :class:`qrcode.matrix.PackedMatrix`: PBM (P4) for bitmaps, PGM (P5)
+for tools that only take graymaps."""
+
+from numpy import array, packbits, uint8, unpackbits, zeros
+
+from qrdraw import QUIET_ZONE_WIDTH
+
+#: PGM gray levels of light and dark pixels.
+PGM_VALUES = array([255, 0], dtype=uint8)
+
+
+def write_pbm(matrix, output, zoom=1, border=QUIET_ZONE_WIDTH):
+    """Writes a symbol as a binary (P4) PBM image, where 1 is black.
+
+    :param matrix: a :class:`qrcode.matrix.PackedMatrix`
+    :param output: a file-like object open for binary writing
+    :param zoom: the side of a module in pixels
+    :param border: the width of the quiet zone in modules
+
+    At zoom 1 the whole image is packed at once: with a border of a whole
+    number of bytes the packed rows of the matrix are only shifted by whole
+    bytes, otherwise the framed modules are packed again in one step.
+    """
+    side = (matrix.side + 2 * border) * zoom
+    output.write(b'P4\n%d %d\n' % (side, side))
+    if zoom == 1:
+        if not border:
+            output.write(matrix.tobytes())
+        elif border % 8 == 0:
+            image = zeros((side, (side + 7) // 8), dtype=uint8)
+            image[border:border + matrix.side,
+                    border // 8:border // 8 + matrix.rows.shape[1]] = (
+                            matrix.rows)
+            output.write(image.tostring())
+        else:
+            framed = zeros((side, side), dtype=bool)
+            framed[border:border + matrix.side,
+                    border:border + matrix.side] = matrix.dark()
+            output.write(packbits(framed, axis=1).tostring())
+        return
+    for row, count in matrix.scaled_rows(zoom, border):
+        output.write(row.tostring() * count)
+
+
+def write_pgm(matrix, output, zoom=1, border=QUIET_ZONE_WIDTH):
+    """Writes a symbol as a binary (P5) PGM image with 8 bit gray levels,
+    black being 0.
+
+    :param matrix: a :class:`qrcode.matrix.PackedMatrix`
+    :param output: a file-like object open for binary writing
+    :param zoom: the side of a module in pixels
+    :param border: the width of the quiet zone in modules
+    """
+    side = (matrix.side + 2 * border) * zoom
+    output.write(b'P5\n%d %d\n255\n' % (side, side))
+    for row, count in matrix.scaled_rows(zoom, border):
+        output.write(PGM_VALUES[unpackbits(row)[:side]].tostring() * count)
@@ -2,65 +2,108 @@
 """This module implements the qrcode Encoder class which handles all the
 operation needed to translate a string into an image."""
 
-from qrdraw import make_array
+import os
+
+from bitbuffer import BitBuffer
+from matrix import PackedMatrix
+from qrdraw import (
+        MASK_PATTERNS,
+        QUIET_ZONE_WIDTH,
+        format_information,
+        make_array,
+        mask_planes,
+        placement_order,
+        select_mask,
+        symbol_template)
+from render import RENDERERS, render_symbol
+from segments import segment
+
+from tempfile import mkstemp
+from timeit import default_timer
+
+from numpy import array, uint8, unpackbits, zeros
 
 from qrutils import (
         convert,
         data_codewords_per_block,
-        determine_datatype,
-        determine_symbol_version,
         ec_codewords,
         mode_indicators,
         num_char_count_indicator_bits,
-        list_to_coeff,
-        make_image,
+        list_to_bin,
         max_codewords,
         max_databits,
-        reed_solomon,
-        to_binstring,
+        reed_solomon_blocks,
+        stack_blocks,
         version_information)
 
 
 class Encoder(object):
-    """Encode numeric and alphanumeric strings in a QR Code Symbol version 2.
+    """Encode strings in a QR Code Symbol, splitting them in numeric,
+    alphanumeric and 8bit segments so that the symbol is as small as possible.
 
     :param input_string: the string you wanto to encode
     :param error_correction_level: defines how many erasures or
                                    errors your symbol will tolerate
                                    maintaining its readability.
+    :param mask_policy: how the mask pattern is chosen: 'exhaustive',
+                        'heuristic' or a fixed pattern reference such as
+                        '000' (see :func:`qrcode.qrdraw.select_mask`).
+    :param symbol_version: use this symbol version instead of the smallest
+                           one able to hold input_string.
     """
-    def __init__(self, input_string, error_correction_level='L'):
+    def __init__(self, input_string, error_correction_level='L',
+            mask_policy='exhaustive', symbol_version=None):
         # input data
         self.input_string = input_string
         self.error_correction_level = error_correction_level
+        self.mask_policy = mask_policy
 
         # automatic recognition data
-        self.data_mode = determine_datatype(input_string)
-        self.symbol_version = determine_symbol_version(input_string,
-                error_correction_level)
-        self.count_bits = num_char_count_indicator_bits(
-                self.symbol_version, self.data_mode)
+        self.symbol_version, self.segments = segment(input_string,
+                error_correction_level, symbol_version)
+        data_modes = set(data_mode for data_mode, _text in self.segments)
+        if len(data_modes) > 1:
+            self.data_mode = 'mixed'
+        else:
+            self.data_mode = data_modes.pop()
 
         # empty data objects
-        self.code = ''
-        self.codewords = []
+        self.buffer = BitBuffer()
+        self.code_length = 0
+        self.data_codewords = bytearray()
         self.data_blocks = []
         self.ec_blocks = []
         self.final_sequence = []
         self.version_information = None
         self.symbol_array = None
+        self.mask_pattern = None
+        self.mask_scores = None
+        self.mask_scoring_time = None
 
         self.encode()
 
+    @property
+    def code(self):
+        """The data bit stream up to the terminator as a string of '0' and
+        '1'; a debug view of the buffer."""
+        return self.buffer.to_binstring(self.code_length)
+
+    @property
+    def codewords(self):
+        """The data codewords as 8 bit strings; a debug view of
+        data_codewords."""
+        return list_to_bin(self.data_codewords)
+
     def encode(self):
         """Encode the input string into a sequence of codewords and error
         correction words."""
         self._convert_input_string()
-        self.codewords = self._bitstream_to_codewords()
+        self._bitstream_to_codewords()
         full = max_codewords(self.symbol_version,
                 self.error_correction_level)
         self._fill_symbol_with_pad_codewords(full -
-                len(self.codewords))
+                len(self.buffer) // 8)
+        self.data_codewords = self.buffer.to_bytes()
 
         self._apply_error_correction()
         self._create_final_sequence()
@@ -69,28 +112,66 @@ class Encoder(object):
         # apply mask
         # matrix position
 
-    def save_image(self, path=None):
-        """Saves the QR Code Symbol to the given 'path'."""
+    def make_matrix(self, mask_policy=None):
+        """Returns the finished symbol as a
+        :class:`qrcode.matrix.PackedMatrix`."""
+        return PackedMatrix.from_array(make_array(self, mask_policy))
+
+    def render(self, output=None, format='png', zoom=5,
+            border=QUIET_ZONE_WIDTH):
+        """Renders the QR Code Symbol in memory, see
+        :func:`qrcode.render.render_symbol`: the image is returned as a
+        string when output is None, else written to output."""
         self.symbol_array = make_array(self)
-        image_path, _image = make_image(self.symbol_array, path=path, zoom=5)
-        return image_path
+        return render_symbol(self.symbol_array, output, format, zoom, border)
+
+    def save_image(self, path=None, zoom=5, border=QUIET_ZONE_WIDTH,
+            format=None, temporary=False):
+        """Saves the QR Code Symbol to the given 'path' and returns it, each
+        module being zoom pixels wide and the symbol surrounded by a quiet
+        zone border modules wide.
+
+        The format defaults to the extension of path, png if it has none.
+        Without a path a temporary file is created, but only if temporary is
+        True. The symbol is built before the file is opened, and the file is
+        removed if writing it fails."""
+        if path is None:
+            if not temporary:
+                raise Exception("No path given")
+            format = format or 'png'
+        else:
+            format = format or os.path.splitext(path)[1][1:].lower() or 'png'
+        if format not in RENDERERS:
+            raise Exception("Unknown image format %r" % (format,))
+        self.symbol_array = make_array(self)
+        if path is None:
+            handle, path = mkstemp(suffix='.' + format)
+            output = os.fdopen(handle, 'wb')
+        else:
+            output = open(path, 'wb')
+        try:
+            with output:
+                render_symbol(self.symbol_array, output, format, zoom, border)
+        except Exception:
+            os.remove(path)
+            raise
+        return path
 
     def _apply_error_correction(self):
         """Creates the error correction block relative to every data block."""
         index = 0
-        coeff_list = list_to_coeff(self.codewords)
+        coeff_list = self.data_codewords
         code_blocks = data_codewords_per_block(self.symbol_version,
                 self.error_correction_level)
         for code_block in code_blocks:
-            self.data_blocks.append(coeff_list[index:index + code_block])
+            self.data_blocks.append(list(coeff_list[index:index + code_block]))
             index += code_block
 
         ec_codewords_per_block = ec_codewords(self.symbol_version,
                 self.error_correction_level) / len(code_blocks)
 
-        for code_block in self.data_blocks:
-            self.ec_blocks.append(
-                    reed_solomon(code_block, ec_codewords_per_block))
+        self.ec_blocks = reed_solomon_blocks(stack_blocks(self.data_blocks),
+                ec_codewords_per_block).tolist()
 
     def _create_final_sequence(self):
         """Interleaves codewords from different codeblocks and append error
@@ -106,50 +187,30 @@ class Encoder(object):
                 self.final_sequence.append(ec_block[i])
 
     def _fill_symbol_with_pad_codewords(self, num_of_codewords):
-        """Fill a symbol to its maximum capacity with alternate pad words."""
-        pad0 = '11101100'
-        pad1 = '00010001'
-        for count in range(num_of_codewords):
-            if count % 2 == 0:
-                self.codewords.append(pad0)
-            else:
-                self.codewords.append(pad1)
+        """Fill a symbol to its maximum capacity with alternate pad words
+        11101100 and 00010001."""
+        pad_codewords = bytearray([236, 17]) * (num_of_codewords // 2 + 1)
+        self.buffer.append_bytes(pad_codewords[:num_of_codewords])
 
     def _terminator(self):
-        """Add zeroes to the code string."""
+        """Add zeroes to the code bit stream."""
         symbol_capacity_bits = max_databits(self.symbol_version,
                 self.error_correction_level)
-        delta = symbol_capacity_bits - len(self.code)
+        delta = symbol_capacity_bits - len(self.buffer)
         if delta >= 4:
             num_of_zeroes = 4
         elif 0 <= delta < 4:
             num_of_zeroes = delta
         else:
             raise Exception("Data is greater than symbol capacity")
-        self.code += ('0' * num_of_zeroes)
+        self.buffer.append(0, num_of_zeroes)
 
     def _bitstream_to_codewords(self):
-        """Split code bit stream into 8 bit codewords."""
+        """Terminate the code bit stream and pad it to a multiple of 8, so
+        that it splits into 8 bit codewords."""
         self._terminator()
-        codewords = []
-        tmp_word = ''
-
-        # pad bitstream to a multiple of 8
-        partial = len(self.code) % 8
-        if partial != 0:
-            code = "".join([self.code, '0' * (8 - partial)])
-        else:
-            code = self.code
-
-        # I need to start from 1 not to have the module condition pass on n=0
-        # and flush the word to the temporary list
-        for count in range(1, len(code) + 1):
-            tmp_word += code[count - 1]
-            if count % 8 == 0:
-                # flush the word to the temporary word list
-                codewords.append(tmp_word)
-                tmp_word = ''
-        return codewords
+        self.code_length = len(self.buffer)
+        self.buffer.pad_to_byte()
 
     def _convert_input_string(self):
         """
@@ -157,23 +218,93 @@ class Encoder(object):
         rules for the mode in force, as defined in ISO/IEC 18004 8.4.1 to
         8.4.5.
         """
-        self.code = "".join([self._insert_indicators(),
-                    convert(self.input_string, self.data_mode)])
+        for data_mode, text in self.segments:
+            self._insert_indicators(data_mode, len(text))
+            convert(text, data_mode, self.buffer)
+
+    def _insert_indicators(self, data_mode, length):
+        """Append mode and character count indicators of a segment to the bit
+        stream."""
+        self.buffer.append(int(mode_indicators(data_mode), 2), 4)
+        self.buffer.append(length,
+                num_char_count_indicator_bits(self.symbol_version, data_mode))
+
+
+class SymbolWriter(object):
+    """Writes symbols of a fixed version and error correction level one
+    payload after the other, for payloads of similar length.
+
+    The template, placement order, mask planes and format information are
+    kept between payloads: each :meth:`write` only encodes the payload,
+    rewrites the data and error correction modules and, when the mask pattern
+    changes, the format information modules.
+
+    :param symbol_version: the version of every symbol
+    :param error_correction_level: the error correction level of every symbol
+    :param mask_policy: as in :class:`Encoder`
+    """
+    def __init__(self, symbol_version, error_correction_level='L',
+            mask_policy='exhaustive'):
+        self.symbol_version = symbol_version
+        self.error_correction_level = error_correction_level
+        self.mask_policy = mask_policy
+
+        self.order = placement_order(symbol_version)
+        planes = mask_planes(symbol_version)
+        #: mask planes in placement order, one row per mask pattern
+        self.mask_bits = planes.reshape(len(planes), -1)[:, self.order]
+        self.symbol_array = symbol_template(symbol_version).copy()
+
+        self.code = None
+        self.mask_pattern = None
+        self.mask_scores = None
+        self.mask_scoring_time = None
+
+    def write(self, input_string):
+        """Encodes input_string and returns the symbol array.
+
+        The array is owned by the writer and overwritten by the next call:
+        copy it, or pack it in a :class:`qrcode.matrix.PackedMatrix`, to keep
+        it."""
+        self.code = Encoder(input_string, self.error_correction_level,
+                self.mask_policy, self.symbol_version)
+        bits = zeros(len(self.order), dtype=uint8)
+        data_bits = unpackbits(array(self.code.final_sequence, dtype=uint8))
+        bits[:len(data_bits)] = data_bits
+
+        start = default_timer()
+        if self.mask_policy in MASK_PATTERNS:
+            mask_pattern, self.mask_scores = self.mask_policy, None
+        else:
+            self.symbol_array.flat[self.order] = bits
+            _array, mask_pattern, self.mask_scores = select_mask(
+                    self.symbol_array, self.error_correction_level,
+                    self.mask_policy)
+        mask_index = MASK_PATTERNS.index(mask_pattern)
+        self.symbol_array.flat[self.order] = bits ^ self.mask_bits[mask_index]
+        if mask_pattern != self.mask_pattern:
+            format_information(self.symbol_array, self.error_correction_level,
+                    mask_pattern)
+            self.mask_pattern = mask_pattern
+        self.mask_scoring_time = default_timer() - start
+
+        self.code.mask_pattern = self.mask_pattern
+        self.code.mask_scores = self.mask_scores
+        self.code.mask_scoring_time = self.mask_scoring_time
+        return self.symbol_array
 
-    def _insert_indicators(self):
-        """Calculates data indicators."""
-        mode_bits = mode_indicators(self.data_mode)
-        indicators = "".join([mode_bits, to_binstring(
-            len(self.input_string), self.count_bits)])
-        return indicators
+    def write_matrix(self, input_string):
+        """Encodes input_string and returns its
+        :class:`qrcode.matrix.PackedMatrix`."""
+        return PackedMatrix.from_array(self.write(input_string))
 
 
 def _main():
     """Creates two Encoder instances for testing purpose."""
     num = Encoder('01234567', 'L')
     alnum = Encoder('asdfdadas876-asd.', 'L')
-    num.save_image()
-    alnum.save_image()
+    num.save_image(temporary=True)
+    alnum.save_image(temporary=True)
     return num, alnum
 
 if __name__ == '__main__':
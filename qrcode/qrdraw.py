@@ -3,11 +3,26 @@
 """This module handles the displacement of data and Function Patterns of a
 qrcode inside a numpy array."""
 
-from numpy import array, rot90
-
-from qrreference import ecl_indicators, symbol_version_data
-
-from qrutils import qr_size, list_to_bin, bch_15_5
+from numpy import (
+        array,
+        bincount,
+        cumsum,
+        intp,
+        newaxis,
+        nonzero,
+        ogrid,
+        ones,
+        rot90,
+        uint8,
+        unpackbits,
+        where,
+        zeros)
+
+from timeit import default_timer
+
+from qrreference import ecl_indicators, symbol_versions
+
+from qrutils import qr_size, bch_15_5, version_information
 
 from alignment_patterns import get_coordinates
 
@@ -21,34 +36,268 @@ LEGENDA = {
         }
 
 
-def make_array(code):
-    """Given a qrcode.Encoder object it returns a complete qrcode array."""
-    symbol_array = position_detection_pattern(code.symbol_version)
-    symbol_array = alignment_pattern(code.symbol_version, symbol_array)
-    symbol_array = timing_pattern(symbol_array)
-    if code.symbol_version >= 7:
-        symbol_array = version_information_positioning(symbol_array,
-                code.version_information)
-    symbol_array = protect_format_info_modules(symbol_array)
+#: Function pattern templates by symbol version, see symbol_template.
+TEMPLATES = {}
+
+
+def symbol_template(symbol_version):
+    """Returns a read-only uint8 array with the function patterns, the version
+    information and the reserved format information modules of a symbol
+    version; every other module is 9 (unassigned).
+
+    Templates are built on first use and kept in TEMPLATES."""
+    try:
+        return TEMPLATES[symbol_version]
+    except KeyError:
+        symbol_array = position_detection_pattern(symbol_version)
+        symbol_array = alignment_pattern(symbol_version, symbol_array)
+        symbol_array = timing_pattern(symbol_array)
+        if symbol_version >= 7:
+            symbol_array = version_information_positioning(symbol_array,
+                    version_information(symbol_version))
+        symbol_array = protect_format_info_modules(symbol_array)
+        symbol_array.flags.writeable = False
+        TEMPLATES[symbol_version] = symbol_array
+        return symbol_array
+
+
+#: Function module masks by symbol version, see function_mask.
+FUNCTION_MASKS = {}
+
+
+def function_mask(symbol_version):
+    """Returns a read-only boolean array of the modules of a symbol version
+    which are not data: function patterns, version and format information.
+    Masks are computed once and kept in FUNCTION_MASKS."""
+    try:
+        return FUNCTION_MASKS[symbol_version]
+    except KeyError:
+        mask = symbol_template(symbol_version) != 9
+        mask.flags.writeable = False
+        FUNCTION_MASKS[symbol_version] = mask
+        return mask
+
+
+def warm_templates(versions=symbol_versions):
+    """Build the templates of the given symbol versions, all by default, ahead
+    of the first make_array call."""
+    for symbol_version in versions:
+        symbol_template(symbol_version)
+
+
+def make_array(code, mask_policy=None):
+    """Given a qrcode.Encoder object it returns a complete qrcode array.
+
+    :param mask_policy: how the mask pattern is chosen, see select_mask;
+                        defaults to code.mask_policy
+
+    The chosen pattern, the penalty scores (None for a fixed pattern) and the
+    seconds spent masking and scoring are stored in code.mask_pattern,
+    code.mask_scores and code.mask_scoring_time."""
+    symbol_array = symbol_template(code.symbol_version).copy()
     unmasked_array = place_data(code, symbol_array)
-    masked_array, mask_pattern = apply_masking(unmasked_array)
-    final_array = format_information(masked_array,
-            code.error_correction_level, mask_pattern)
+    start = default_timer()
+    final_array, code.mask_pattern, code.mask_scores = select_mask(
+            unmasked_array, code.error_correction_level,
+            mask_policy or code.mask_policy)
+    code.mask_scoring_time = default_timer() - start
     return final_array
 
 
-def apply_masking(unmasked_array):
+#: ISO/IEC 18004 Table 23: data mask pattern references and the conditions,
+#  on row i and column j, of the modules they invert.
+MASK_CONDITIONS = [
+        ('000', lambda i, j: (i + j) % 2 == 0),
+        ('001', lambda i, j: i % 2 == 0),
+        ('010', lambda i, j: j % 3 == 0),
+        ('011', lambda i, j: (i + j) % 3 == 0),
+        ('100', lambda i, j: ((i // 2) + (j // 3)) % 2 == 0),
+        ('101', lambda i, j: (i * j) % 2 + (i * j) % 3 == 0),
+        ('110', lambda i, j: ((i * j) % 2 + (i * j) % 3) % 2 == 0),
+        ('111', lambda i, j: ((i + j) % 2 + (i * j) % 3) % 2 == 0),
+        ]
+
+#: Mask pattern references in the order of the planes of mask_planes.
+MASK_PATTERNS = [pattern for pattern, _condition in MASK_CONDITIONS]
+
+#: Data mask planes by symbol version, see mask_planes.
+MASK_PLANES = {}
+
+
+def symbol_version_from_size(side_size):
+    """Given the length of the side of a symbol returns its version.
+
+    >>> symbol_version_from_size(21)
+    1
+
+    """
+    return (side_size - 17) // 4
+
+
+def mask_planes(symbol_version):
+    """Returns a read-only (8, side, side) boolean array: plane n holds the
+    modules inverted by mask pattern MASK_PATTERNS[n], restricted to the
+    encoding region of the symbol version. Planes are computed once and kept
+    in MASK_PLANES."""
+    try:
+        return MASK_PLANES[symbol_version]
+    except KeyError:
+        encoding_region = symbol_template(symbol_version) == 9
+        side = encoding_region.shape[0]
+        i, j = ogrid[:side, :side]
+        planes = array([condition(i, j) & encoding_region
+            for _pattern, condition in MASK_CONDITIONS])
+        planes.flags.writeable = False
+        MASK_PLANES[symbol_version] = planes
+        return planes
+
+
+def apply_masking(unmasked_array, mask_pattern='000'):
     """Given an unmasked array returns the masked array and the mask
-    pattern. I omit the best mask selection to generate the first symbol.
-    I choose to apply '000' masking."""
-    for i in range(len(unmasked_array[0])):
-        for j in range(len(unmasked_array[0])):
-            if (i + j) % 2 == 0:
-                if unmasked_array[i][j] == 0:
-                    unmasked_array[i][j] = 1
-                elif unmasked_array[i][j] == 1:
-                    unmasked_array[i][j] = 0
-    return unmasked_array, '000'
+    pattern. The best mask selection is omitted: '000' masking is applied
+    unless another pattern is given.
+
+    Masking is a single xor with the pattern plane from mask_planes."""
+    planes = mask_planes(symbol_version_from_size(unmasked_array.shape[0]))
+    unmasked_array ^= planes[MASK_PATTERNS.index(mask_pattern)]
+    return unmasked_array, mask_pattern
+
+
+#: ISO/IEC 18004 Table 24 penalty weights N1 to N4.
+PENALTY_WEIGHTS = (3, 3, 40, 10)
+
+#: Finder-like patterns, 1:1:3:1:1 preceded or followed by 4 light modules.
+FINDER_LIKE_PATTERNS = (
+        array([1, 0, 1, 1, 1, 0, 1, 0, 0, 0, 0], dtype=bool),
+        array([0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1], dtype=bool),
+        )
+
+
+def dark_modules(symbol_array):
+    """Returns a boolean array of the dark modules of one or more symbols."""
+    return (symbol_array == 1) | (symbol_array == 7)
+
+
+def run_penalty(dark):
+    """N1: every run of 5 + i modules of the same color in a row scores
+    N1 + i. Returns the penalty of each symbol of a (masks, rows, columns)
+    boolean array; rows of all symbols are handled at once by numbering runs
+    with a cumulative sum over their starts."""
+    masks, rows, columns = dark.shape
+    lines = dark.reshape(masks * rows, columns)
+    starts = ones(lines.shape, dtype=bool)
+    starts[:, 1:] = lines[:, 1:] != lines[:, :-1]
+    starts = starts.ravel()
+    run_lengths = bincount(cumsum(starts) - 1)
+    run_masks = nonzero(starts)[0] // (rows * columns)
+    points = where(run_lengths >= 5, run_lengths - 5 + PENALTY_WEIGHTS[0], 0)
+    return bincount(run_masks, weights=points, minlength=masks)
+
+
+def block_penalty(dark):
+    """N2: every 2x2 block of the same color scores N2 (blocks overlap)."""
+    total = (dark[:, :-1, :-1].astype(uint8) + dark[:, 1:, :-1] +
+            dark[:, :-1, 1:] + dark[:, 1:, 1:])
+    same = (total == 0) | (total == 4)
+    return same.sum(axis=2).sum(axis=1) * PENALTY_WEIGHTS[1]
+
+
+def finder_penalty(dark):
+    """N3: every 1:1:3:1:1 dark pattern in a row preceded or followed by 4
+    light modules scores N3. The quiet zone counts as light area."""
+    masks, rows, columns = dark.shape
+    padded = zeros((masks, rows, columns + 8), dtype=bool)
+    padded[:, :, 4:-4] = dark
+    windows = columns + 8 - 10
+    count = zeros(masks, dtype=int)
+    for pattern in FINDER_LIKE_PATTERNS:
+        match = ones((masks, rows, windows), dtype=bool)
+        for offset, module in enumerate(pattern):
+            window = padded[:, :, offset:offset + windows]
+            match &= window if module else ~window
+        count += match.sum(axis=2).sum(axis=1)
+    return count * PENALTY_WEIGHTS[2]
+
+
+def balance_penalty(dark):
+    """N4: every 5% deviation of the dark modules proportion from 50% scores
+    N4."""
+    modules = dark.shape[1] * dark.shape[2]
+    dark_count = dark.sum(axis=2).sum(axis=1)
+    return (abs(20 * dark_count - 10 * modules) // modules) * PENALTY_WEIGHTS[3]
+
+
+def heuristic_penalty_scores(candidates):
+    """A cheaper version of penalty_scores: N1 is only computed on rows and N3
+    is skipped (left to 0), the two most expensive scans."""
+    dark = dark_modules(candidates)
+    return array([
+        run_penalty(dark),
+        block_penalty(dark),
+        zeros(len(dark), dtype=int),
+        balance_penalty(dark),
+        ], dtype=int).T
+
+
+def penalty_scores(candidates):
+    """Given a (masks, side, side) array of symbols returns a (masks, 4)
+    array with their N1, N2, N3 and N4 penalties, rows and columns
+    included."""
+    dark = dark_modules(candidates)
+    columns = dark.transpose(0, 2, 1)
+    return array([
+        run_penalty(dark) + run_penalty(columns),
+        block_penalty(dark),
+        finder_penalty(dark) + finder_penalty(columns),
+        balance_penalty(dark),
+        ], dtype=int).T
+
+
+def masked_candidates(unmasked_array, ecl):
+    """Returns a (8, side, side) array with the unmasked array masked by each
+    pattern of MASK_PATTERNS and its format information in place."""
+    planes = mask_planes(symbol_version_from_size(unmasked_array.shape[0]))
+    candidates = unmasked_array[newaxis] ^ planes
+    for candidate, mask_pattern in zip(candidates, MASK_PATTERNS):
+        format_information(candidate, ecl, mask_pattern)
+    return candidates
+
+
+#: Mask selection policies accepted by select_mask, besides a fixed pattern.
+MASK_POLICIES = {
+        'exhaustive': penalty_scores,
+        'heuristic': heuristic_penalty_scores,
+        }
+
+
+def select_mask(unmasked_array, ecl, mask_policy='exhaustive'):
+    """Masks an unmasked array and places its format information. Returns the
+    final array, the mask pattern and the (8, 4) penalty scores, rows in
+    MASK_PATTERNS order.
+
+    :param mask_policy: one of
+
+                        * a mask pattern reference such as '000': that
+                          pattern is applied and nothing is scored (scores
+                          are None)
+                        * 'heuristic': the lowest penalty pattern according
+                          to heuristic_penalty_scores
+                        * 'exhaustive': the lowest penalty pattern according
+                          to all the ISO/IEC 18004 rules
+    """
+    if mask_policy in MASK_PATTERNS:
+        masked_array, mask_pattern = apply_masking(unmasked_array, mask_policy)
+        final_array = format_information(masked_array, ecl, mask_pattern)
+        return final_array, mask_pattern, None
+    try:
+        scorer = MASK_POLICIES[mask_policy]
+    except KeyError:
+        raise Exception("Unknown mask policy %r" % (mask_policy,))
+    candidates = masked_candidates(unmasked_array, ecl)
+    scores = scorer(candidates)
+    best = int(scores.sum(axis=1).argmin())
+    return candidates[best], MASK_PATTERNS[best], scores
+
 
 def format_information(masked_array, ecl, mask_pattern):
     """Place format information in symbol; returns the final array, no further
@@ -83,6 +332,42 @@ def protect_format_info_modules(symbol_array):
     return symbol_array
 
 
+#: Data module visiting order by symbol version, see placement_order.
+PLACEMENT_ORDERS = {}
+
+
+def placement_order(symbol_version):
+    """Returns the flat indexes of the encoding region modules of a symbol
+    version in data placement order.
+
+    The array is rotated 180 degrees so that placement starts from
+    symbol_array[0][0], then two-module wide columns are walked alternately
+    downwards and upwards, visiting the left then the right module of each
+    row and skipping every module of the template which is not 9. Orders are
+    computed once and kept in PLACEMENT_ORDERS."""
+    try:
+        return PLACEMENT_ORDERS[symbol_version]
+    except KeyError:
+        rotated = rot90(symbol_template(symbol_version), 2)
+        side = rotated.shape[0]
+        last = side - 1
+        order = []
+        for left_column in range(0, side, 2):
+            if (left_column // 2) % 2 == 0:
+                rows = range(side)
+            else:
+                rows = range(last, -1, -1)
+            columns = [x for x in (left_column, left_column + 1) if x < side]
+            for row in rows:
+                for column in columns:
+                    if rotated[row][column] == 9:
+                        order.append((last - row) * side + last - column)
+        order = array(order, dtype=intp)
+        order.flags.writeable = False
+        PLACEMENT_ORDERS[symbol_version] = order
+        return order
+
+
 def place_data(code, symbol_array):
     """An alternative method for placement in the symbol, which yields the
     same result, is to regard the interleaved codeword sequence as a single
@@ -93,68 +378,18 @@ def place_data(code, symbol_array):
     according to the direction of placement and skipping areas occupied by
     function patterns, changing direction at the top or bottom of the column.
     Each bit shall always be placed in the first available module position.
+
+    The module order comes from :func:`placement_order`; the data bits,
+    followed by the zero remainder bits, are written with a single indexed
+    assignment.
     """
-    # Rotate the array 180 degrees so that data positioning start from
-    # symbol_array[0][0]
-    symbol_array = rot90(symbol_array, 2)
-    flat_data_list = list("".join(list_to_bin(code.final_sequence))) + ([0] *
-            symbol_version_data[code.symbol_version]['remainder_bits'])
-    top = 0
-    bottom = qr_size(code.symbol_version) - 1
-    direction = 1
-    left_column = 0
-    row = 0
-    column = 0
-    while flat_data_list:
-        # If we have reached top or bottom margins
-        if direction == 1:
-            if row > bottom:
-                # reset row to bottom index
-                row = bottom
-                # shift by 2 columns
-                left_column += 2
-                column = left_column
-                # invert direction
-                direction *= -1
-        else:
-            if row < top:
-                # reset row to top index
-                row = top
-                left_column += 2
-                column = left_column
-                direction *= -1
-
-        try:
-            if symbol_array[row][column] == 9:
-                data = flat_data_list.pop(0)
-                symbol_array[row][column] = data
-        except IndexError:
-            pass
-
-        if column % 2 == 0:
-            column += 1
-        else:
-            column = left_column
-            row += 1 * direction
-
-    # rotate back the symbol
-    return rot90(symbol_array, 2)
-
-
-def pbm_image(symbol_size, symbol_array):
-    """Creates a pbm given a symbol size and a qrcode array."""
-    with open('test.pbm', 'w') as output_file:
-        output_file.writelines([
-            'P1\n',
-            " ".join([str(symbol_size), str(symbol_size), '\n'])
-             ])
-        for arr in symbol_array:
-            for module in arr:
-                if module == 9:
-                    module = 0
-                output_file.write("".join([str(module), ' ']))
-            output_file.write('\n')
-    return True
+    order = placement_order(code.symbol_version)
+    data_bits = unpackbits(array(code.final_sequence, dtype=uint8))
+    bits = zeros(len(order), dtype=uint8)
+    bits[:len(data_bits)] = data_bits
+    symbol_array.flat[order] = bits
+    return symbol_array
+
 
 def version_information_positioning(symbol_array, version_information):
     """Place version information data in the proper array modules."""
@@ -191,7 +426,7 @@ def position_detection_pattern(symbol_version):
     """Assign Position Detection Pattern bits and relative separators."""
     side_size = qr_size(symbol_version)
 
-    arr = array([[9] * side_size] * side_size)
+    arr = array([[9] * side_size] * side_size, dtype=uint8)
     arr[0] = arr[6] = [7] * 7 + [6] + [9] * (side_size - 16) + [6] + [7] * 7
     arr[1] = arr[5] = ([7, 6, 6, 6, 6, 6, 7, 6] +
             [9] * (side_size - 16) +
@@ -255,9 +490,25 @@ def draw_alignment_pattern(center, symbol_array):
     return symbol_array
 
 
-def quiet_zone():
+#: Width in modules of the quiet zone (ISO/IEC 18004 6.3.8).
+QUIET_ZONE_WIDTH = 4
+
+
+def quiet_zone(symbol_array, width=QUIET_ZONE_WIDTH):
     """
     This is a region 4X wide which shall be free of all other markings,
     surrounding the symbol on all four sides. Its nominal reflectance value
     shall be equal to that of the light modules.
+
+    Returns a copy of symbol_array surrounded by width light modules; boolean
+    arrays of dark modules are accepted as well.
+
+    >>> quiet_zone(array([[7]], dtype=uint8), 1).tolist()
+    [[0, 0, 0], [0, 7, 0], [0, 0, 0]]
+
     """
+    rows, columns = symbol_array.shape
+    framed = zeros((rows + 2 * width, columns + 2 * width),
+            dtype=symbol_array.dtype)
+    framed[width:width + rows, width:width + columns] = symbol_array
+    return framed
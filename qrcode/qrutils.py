@@ -1,76 +1,86 @@
 """qrcode package utilities."""
 
-from numpy import poly1d
-from PIL import Image
+import os
+import re
+
+from numpy import array, asarray, uint8, zeros
 from math import sqrt
-from tempfile import mktemp
+from string import digits
+from tempfile import mkstemp
 
 from qrreference import (
         alphanumeric_char_string,
         alphanumeric_char_values,
         blocks_per_ecl,
         ecl_index,
-        generator_polynomials,
         max_char_capacity_table,
         mode_indicators_table,
         num_of_bits_character_count_indicator,
         symbol_sizes,
-        symbol_version_data,
-        version_information_bit_string)
+        symbol_version_data)
 
-from gf import GFPoly, GaloisField
+from bitbuffer import BitBuffer
+from gf import GaloisField
 
 
 GF256 = GaloisField()
 
+#: GF(256) log and antilog tables for vectorized arithmetic. The antilog table
+#  is repeated twice so that the sum of two logs never needs a modulo, and is
+#  followed by zeroes: the log of 0 points there so that any product with 0 is
+#  0 without branching.
+GF256_ALOG = array(GF256.alog[:255] * 2 + [0] * 255, dtype=uint8)
+GF256_LOG = array([510] + GF256.log[1:], dtype=int)
+
+
+#: BCH(15,5) generator polynomial x^10 + x^8 + x^5 + x^4 + x^2 + x + 1 and
+#  format information mask, ISO/IEC 18004 Annex C
+FORMAT_GENERATOR = 0x537
+FORMAT_MASK = 0x5412
+
+#: BCH(18,6) generator polynomial
+#  x^12 + x^11 + x^10 + x^9 + x^8 + x^5 + x^2 + 1, ISO/IEC 18004 Annex D
+VERSION_GENERATOR = 0x1f25
 
-def bch_18_6(symbol_version):
-    """Calculate BCH(18,6) on symbol version number.
 
-    This function is not used as in the specs we have a reference table
-    covering all the symbol version. It was just to test if I would have
-    obtained the same results.
+def bch_code(data, generator):
+    """Returns data followed by the remainder of its division by the BCH
+    generator polynomial, both given as integers whose bits are the
+    polynomial coefficients.
+
+    >>> bin(bch_code(7, VERSION_GENERATOR))
+    '0b111110010010100'
+
     """
-    data_bit_string = to_binstring(symbol_version, 6)
-    numerator = (
-            poly1d([int(x) for x in data_bit_string]) *
-            poly1d([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]))
-    generator_polynomial = poly1d([1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 1, 0, 1])
-    _quotient, remainder = numerator / generator_polynomial
-    coeff_list = [abs(int(x)) for x in remainder.coeffs]
-    # don't know why i have some 2 and 3 coefficients. used a modulo operation
-    # to obtain the expected results
-    coeff_list = [x % 2 for x in coeff_list]
-    while len(coeff_list) < 12:
-        coeff_list.insert(0, 0)
-    coeff_string = ''
-    for coeff in coeff_list:
-        coeff_string += str(coeff)
-
-    result = data_bit_string + coeff_string
-    return result
+    check_bits = generator.bit_length() - 1
+    remainder = data << check_bits
+    for shift in range(data.bit_length() - 1, -1, -1):
+        if (remainder >> (shift + check_bits)) & 1:
+            remainder ^= generator << shift
+    return (data << check_bits) | remainder
+
+
+#: Masked format information words indexed by the 5 data bits (error
+#  correction level indicator followed by the mask pattern reference).
+FORMAT_INFORMATION = [bch_code(data, FORMAT_GENERATOR) ^ FORMAT_MASK
+        for data in range(32)]
+
+#: Version information words for symbol versions 7 to 40.
+VERSION_INFORMATION = dict((version, bch_code(version, VERSION_GENERATOR))
+        for version in range(7, 41))
+
+
+def bch_18_6(symbol_version):
+    """Returns the 18 bit BCH(18,6) version information string for a symbol
+    version between 7 and 40."""
+    return to_binstring(VERSION_INFORMATION[symbol_version], 18)
 
 
 def bch_15_5(data_bit_string):
     """Calculate BCH(15,5) on input bit string and return the masked result.
 
     Masking operation is a XOR with the bit string *101010000010010*."""
-    numerator = (
-            poly1d([int(x) for x in data_bit_string]) *
-            poly1d([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]))
-    generator_polynomial = poly1d([1, 0, 1, 0, 0, 1, 1, 0, 1, 1, 1])
-    _quotient, remainder = numerator / generator_polynomial
-    coeff_list = [abs(int(x)) for x in remainder.coeffs]
-    coeff_list = [x % 2 for x in coeff_list]
-    while len(coeff_list) < 10:
-        coeff_list.insert(0, 0)
-    coeff_string = ''
-    for coeff in coeff_list:
-        coeff_string += str(coeff)
-
-    unmasked = data_bit_string + coeff_string
-    masked = to_binstring(to_coeff(unmasked) ^ to_coeff('101010000010010'), 15)
-    return masked
+    return to_binstring(FORMAT_INFORMATION[int(data_bit_string, 2)], 15)
 
 
 def data_codewords_per_block(version, ecl):
@@ -165,12 +175,70 @@ def alphanumeric_codes(input_string):
 
 
 def version_information(symbol_version):
-    """Uses ISO/IEC 18004 Table D.1 but I'd like to calculate BCH(18,6) on my
-    own.
+    """Returns the version information bit string, empty for symbols smaller
+    than version 7. It matches ISO/IEC 18004 Table D.1.
     """
     if symbol_version < 7:
         return ''
-    return version_information_bit_string[symbol_version]
+    return bch_18_6(symbol_version)
+
+
+#: Character classes found by :func:`classify`: digits, alphanumeric
+#  characters, lower case letters (alphanumeric once upper cased) and
+#  characters only 8bit mode can encode.
+CLASS_NUMERIC, CLASS_ALPHANUMERIC, CLASS_LOWERCASE, CLASS_8BIT = '0123'
+
+
+def char_class(char):
+    """Returns the class of a single character."""
+    if char in digits:
+        return CLASS_NUMERIC
+    elif char in alphanumeric_char_string:
+        return CLASS_ALPHANUMERIC
+    elif char.upper() in alphanumeric_char_string:
+        return CLASS_LOWERCASE
+    else:
+        return CLASS_8BIT
+
+
+#: str.translate table mapping every byte to its character class.
+CHAR_CLASS_TABLE = ''.join(char_class(chr(code)) for code in range(256))
+
+#: Matches runs of characters of the same class.
+CLASS_RUNS = re.compile('0+|1+|2+|3+')
+
+
+def classify(input_string):
+    """Scans input_string once and returns the data mode chosen by
+    :func:`determine_datatype` together with a string holding the class of
+    every character.
+
+    >>> classify('ab-12@')
+    ('8bit', '221003')
+
+    """
+    if isinstance(input_string, unicode):
+        # characters outside Latin-1 can only be 8bit
+        input_string = input_string.encode('latin-1', 'replace')
+    classes = input_string.translate(CHAR_CLASS_TABLE)
+    if CLASS_8BIT in classes:
+        return '8bit', classes
+    elif classes and classes.count(CLASS_NUMERIC) == len(classes):
+        return 'numeric', classes
+    else:
+        return 'alphanumeric', classes
+
+
+def class_runs(classes):
+    """Given the classes returned by :func:`classify` returns a list of
+    (class, length) runs.
+
+    >>> class_runs('221003')
+    [('2', 2), ('1', 1), ('0', 2), ('3', 1)]
+
+    """
+    return [(classes[run.start()], run.end() - run.start())
+            for run in CLASS_RUNS.finditer(classes)]
 
 
 def determine_datatype(input_string):
@@ -185,28 +253,15 @@ def determine_datatype(input_string):
     '8bit'
 
     """
-    if input_string.isdigit():
-        return 'numeric'
-    elif all(ch.upper() in alphanumeric_char_string
-            for ch in input_string):
-        return 'alphanumeric'
-    else:
-        return '8bit'
+    return classify(input_string)[0]
 
 
 def determine_symbol_version(input_string, ecl):
     """Determine symbol version for input_string based on error correction
-    level with minimum empty space"""
-    data_type = determine_datatype(input_string)
-    input_string_length = len(input_string)
-    current = 1
-    while current <= 40:
-        if (max_char_capacity(data_type, current, ecl) >=
-                input_string_length):
-            return current
-        else:
-            current += 1
-    raise Exception("String is too long!")
+    level with minimum empty space; see :func:`qrcode.segments.segment`."""
+    # imported here: segments is built on this module
+    from segments import segment
+    return segment(input_string, ecl)[0]
 
 
 def split_numeric_input(input_string):
@@ -263,21 +318,26 @@ def pad(bit_string, length):
     return "".join([bit_string, '0' * zeroes])
 
 
-def convert(input_string, data_mode):
+def convert(input_string, data_mode, bit_buffer=None):
     """Given an input string and a data mode returns the qrcode bit stream
-    representation of the input."""
+    representation of the input as a BitBuffer.
+
+    If bit_buffer is given the bits are appended to it.
+
+    >>> str(convert('AC-42', 'alphanumeric'))
+    '0011100111011100111001000010'
+
+    """
+    if bit_buffer is None:
+        bit_buffer = BitBuffer()
     if data_mode == 'numeric':
     #: ISO/IEC 18004 8.4.2: The input data string is divided into groups of
     #  three digits, and each group is converted to its 10 bit binary
     #  equivalent.  If the number of input digits is not an exact multiple of
     #  three, the final one or two digits are converted to 4 or 7 bits
-    #  respectively.  Returns the input respresentation as a bit string.
-        splitted_input = split_numeric_input(input_string)
-        data_bit_stream = ''
-        for input_string in splitted_input:
-            data_bit_stream += to_binstring(int(input_string),
-                    (len(input_string) * 3) + 1)
-        return data_bit_stream
+    #  respectively.
+        for group in split_numeric_input(input_string):
+            bit_buffer.append(int(group), (len(group) * 3) + 1)
     #: """ISO/IEC 18004 8.4.3: Input data characters are divided into groups of
     #  two characters which are encoded to 11-bit binary codes. The character
     #  value of the first character is multiplied by 45 and the character value
@@ -287,20 +347,15 @@ def convert(input_string, data_mode):
     #  a 6-bit binary number.
     elif data_mode == 'alphanumeric':
         input_codes = alphanumeric_codes(input_string)
-        splitted_input = split_alphanumeric_input(input_codes)
-        data_bit_stream = ''
-        for input_string in splitted_input:
-            if len(input_string) == 2:
-                data_bit_stream += to_binstring(input_string[0] * 45 +
-                        input_string[1], 11)
+        for pair in split_alphanumeric_input(input_codes):
+            if len(pair) == 2:
+                bit_buffer.append(pair[0] * 45 + pair[1], 11)
             else:
-                data_bit_stream += to_binstring(input_string[0], 6)
-        return data_bit_stream
+                bit_buffer.append(pair[0], 6)
     elif data_mode == '8bit':
-        data_bit_stream = ''
         for char in input_string:
-            data_bit_stream += to_binstring(ord(char), 8)
-        return data_bit_stream
+            bit_buffer.append(ord(char), 8)
+    return bit_buffer
 
 def list_to_bin(coefficients_list):
     """Given a list of codewords represented as integers it returns a
@@ -320,27 +375,136 @@ def to_coeff(codeword):
     """Given a codeword represented as a binary string it returns its integer
     value.
     """
-    count = len(codeword)
-    result = 0
-    for bit in codeword:
-        if bit == '1':
-            result += pow(2, count - 1)
-        count -= 1
-    return result
+    if not codeword:
+        return 0
+    return int(codeword, 2)
+
+
+#: Multiplication tables of the generator polynomials, keyed by number of error
+#  correction words. See :func:`generator_table`.
+GENERATOR_TABLES = {}
+
+
+def generator_table(num_of_ec_words):
+    """Returns the multiplication table of the generator polynomial for a given
+    number of error correction words.
+
+    Row *n* of the table holds the generator coefficients (leading term
+    excluded) multiplied by *n* in GF(256), packed in a single integer with the
+    highest degree coefficient in the most significant byte. Tables are built
+    on first use and cached in GENERATOR_TABLES.
+
+    >>> table = generator_table(7)
+    >>> len(table), table[0]
+    (256, 0)
+
+    """
+    try:
+        return GENERATOR_TABLES[num_of_ec_words]
+    except KeyError:
+        generator = [GF256.alpha_power(x) for x in
+                GF256.generator_polynomial(num_of_ec_words)[1:]]
+        table = []
+        for factor in range(256):
+            row = 0
+            for coeff in generator:
+                row = (row << 8) | GF256.multiply(factor, coeff)
+            table.append(row)
+        GENERATOR_TABLES[num_of_ec_words] = table
+        return table
 
 
 def reed_solomon(coefficients, num_of_ec_words):
     """Returns the reed-solomon error correction list of coefficients given a
     list of codewords and the number of error correction words.
+
+    The remainder of the polynomial division is computed with a shift register
+    of num_of_ec_words bytes held in a single integer: for every codeword the
+    register is shifted by one byte and xored with the row of the generator
+    table selected by the outgoing byte.
+
+    >>> reed_solomon([16, 32, 12, 86, 97, 128, 236, 17, 236, 17, 236, 17,
+    ...     236, 17, 236, 17], 10)
+    [165, 36, 212, 193, 237, 54, 199, 135, 44, 85]
+
     """
-    num = GFPoly(GF256, coefficients).multiply_by_monomial(num_of_ec_words, 1)
-    den = GFPoly(GF256, [GF256.alpha_power(x) for x in
-        generator_polynomials[num_of_ec_words]])
-    _quotient, rem = num / den
-    return rem.coefficients
+    table = generator_table(num_of_ec_words)
+    shift = 8 * (num_of_ec_words - 1)
+    mask = (1 << (8 * num_of_ec_words)) - 1
+    register = 0
+    for coeff in coefficients:
+        register = ((register << 8) & mask) ^ table[(register >> shift) ^ coeff]
+    return [int((register >> bits) & 0xff) for bits in range(shift, -1, -8)]
 
 
-def make_image(data, path=None, width=None, raw_list=False, zoom=1):
+def stack_blocks(blocks):
+    """Given a list of codeword blocks returns a 2-D uint8 array with a block
+    per row, suitable for :func:`reed_solomon_blocks`.
+
+    Shorter blocks are padded with leading zeroes, which leave their error
+    correction codewords unchanged.
+
+    >>> stack_blocks([[1, 2], [3, 4, 5]]).tolist()
+    [[0, 1, 2], [3, 4, 5]]
+
+    """
+    width = max(len(block) for block in blocks)
+    stacked = zeros((len(blocks), width), dtype=uint8)
+    for row, block in zip(stacked, blocks):
+        row[width - len(block):] = block
+    return stacked
+
+
+def reed_solomon_blocks(data_blocks, num_of_ec_words):
+    """Vectorized version of :func:`reed_solomon` computing the error
+    correction codewords of many blocks at once.
+
+    :param data_blocks: a 2-D uint8 array with a data block per row, as
+                        returned by :func:`stack_blocks`
+    :param num_of_ec_words: the number of error correction words per block
+
+    Returns a (blocks, num_of_ec_words) uint8 array. Rows can come from any
+    number of symbols, provided they all share the same number of error
+    correction words.
+
+    >>> reed_solomon_blocks([[16, 32, 12, 86, 97, 128, 236, 17, 236, 17, 236,
+    ...     17, 236, 17, 236, 17]], 10).tolist()
+    [[165, 36, 212, 193, 237, 54, 199, 135, 44, 85]]
+
+    """
+    data_blocks = asarray(data_blocks, dtype=uint8)
+    generator = array(GF256.generator_polynomial(num_of_ec_words)[1:])
+    register = zeros((data_blocks.shape[0], num_of_ec_words), dtype=uint8)
+    for column in data_blocks.T:
+        factor = GF256_LOG[column ^ register[:, 0]]
+        register[:, :-1] = register[:, 1:]
+        register[:, -1] = 0
+        register ^= GF256_ALOG[factor[:, None] + generator]
+    return register
+
+
+#: Pixel value of each symbol array module value (see
+#  :data:`qrcode.qrdraw.LEGENDA`): black for dark modules, white otherwise.
+PIXEL_VALUES = array([255] * 256, dtype=uint8)
+PIXEL_VALUES[[1, 7]] = 0
+
+
+def raster(symbol_array, zoom=1):
+    """Returns the grayscale pixels of a symbol array, each module becoming a
+    zoom x zoom square.
+
+    >>> raster(array([[1, 0], [6, 7]], dtype=uint8), 2).tolist()
+    [[0, 0, 255, 255], [0, 0, 255, 255], [255, 255, 0, 0], [255, 255, 0, 0]]
+
+    """
+    pixels = PIXEL_VALUES[symbol_array]
+    if zoom > 1:
+        pixels = pixels.repeat(zoom, axis=0).repeat(zoom, axis=1)
+    return pixels
+
+
+def make_image(data, path=None, width=None, raw_list=False, zoom=1,
+        temporary=False):
     """Creates a png image for the incoming data.
 
     :param data: encoded data
@@ -348,30 +512,32 @@ def make_image(data, path=None, width=None, raw_list=False, zoom=1):
     :param width: the length of the side of the symbol
     :param raw_list: wether data is a raw_list or not
     :param zoom: image zoom multiplier
+    :param temporary: create a temporary file if no path is given
 
-    If no path is given, a temporary file is created.
+    A path is required unless temporary is True.
 
     By default data is expected to be in an nested numpy array, but a raw list
     is accepted if the corisponding flag is set.
 
     If width is not esplicitely given, it is calculated as the square root of
-    the data-length."""
-    if not raw_list:
-        data = [list(array) for array in data]
-        data = sum(data, [])
-    width = width or sqrt(len(data))
-    if width != int(width):
+    the data-length. The quiet zone is not added: see
+    :func:`qrcode.qrdraw.quiet_zone`."""
+    if path is None and not temporary:
+        raise Exception("No path given")
+    # imported here so that the PIL import is paid only by image users; see
+    # qrcode.png for a writer which does not need it
+    from PIL import Image
+    data = asarray(data, dtype=uint8)
+    if raw_list:
+        width = width or sqrt(len(data))
+        if width != int(width):
+            raise RuntimeError("malformed data")
+        data = data.reshape(int(width), int(width))
+    elif data.ndim != 2 or data.shape[0] != data.shape[1]:
         raise RuntimeError("malformed data")
-    width = int(width)
-    tmp_data = []
-    for i in data:
-        if i in (1, 7):
-            tmp_data.append(0)
-        else:
-            tmp_data.append(1)
-    img = Image.new("1", (width, width))
-    img.putdata(tmp_data)
-    img = img.resize((width * zoom, width * zoom))
-    path = path or (mktemp() + ".png")
+    img = Image.fromarray(raster(data, zoom)).convert('1', dither=Image.NONE)
+    if path is None:
+        handle, path = mkstemp(suffix='.png')
+        os.close(handle)
     img.save(path)
     return path, img
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Renders finished symbols in memory: to a string, to any file-like object or
+into a pre-allocated buffer, in every format the package can write."""
+
+from io import BytesIO
+
+from matrix import PackedMatrix
+from png import write_png
+from pnm import write_pbm, write_pgm
+from qrdraw import QUIET_ZONE_WIDTH
+from svg import write_svg
+from terminal import write_text
+
+
+def _packed(writer):
+    """Adapts a writer of PackedMatrix instances to symbol arrays."""
+    def write(symbol_array, output, zoom, border):
+        writer(PackedMatrix.from_array(symbol_array), output, zoom, border)
+    write.__doc__ = writer.__doc__
+    return write
+
+
+def _text(symbol_array, output, _zoom, border):
+    """Writes a symbol as UTF-8 text, see
+    :func:`qrcode.terminal.write_text`; zoom does not apply."""
+    write_text(PackedMatrix.from_array(symbol_array), output, border,
+            encoding='utf-8')
+
+
+#: Writers by format name; each one takes a symbol array, a file-like output,
+#  the zoom and the quiet zone width.
+RENDERERS = {
+        'pbm': _packed(write_pbm),
+        'pgm': _packed(write_pgm),
+        'png': _packed(write_png),
+        'svg': write_svg,
+        'txt': _text,
+        }
+
+
+class BufferWriter(object):
+    """A file-like object writing into a pre-allocated buffer, such as a
+    bytearray, from its start.
+
+    >>> buf = bytearray(4)
+    >>> writer = BufferWriter(buf)
+    >>> writer.write(b'abc')
+    >>> writer.position, str(buf)
+    (3, 'abc\\x00')
+
+    """
+    __slots__ = ('view', 'position')
+
+    def __init__(self, buf):
+        self.view = memoryview(buf)
+        self.position = 0
+
+    def write(self, data):
+        """Copies data after what was written so far."""
+        end = self.position + len(data)
+        if end > len(self.view):
+            raise Exception("Output buffer too small")
+        self.view[self.position:end] = data
+        self.position = end
+
+
+def render_symbol(symbol_array, output=None, format='png', zoom=1,
+        border=QUIET_ZONE_WIDTH):
+    """Renders a symbol array in one of the RENDERERS formats.
+
+    :param output: where the image goes:
+
+                   * None: the image is returned as a string
+                   * a bytearray or other writable buffer: the image is
+                     written from its start and its length is returned
+                   * any object with a write method, such as an open file,
+                     a BytesIO or a socket file: the image is written to it
+    :param format: 'png', 'pbm', 'pgm', 'svg' or 'txt'
+    :param zoom: the side of a module in pixels
+    :param border: the width of the quiet zone in modules
+    """
+    try:
+        writer = RENDERERS[format]
+    except KeyError:
+        raise Exception("Unknown image format %r" % (format,))
+    if output is None:
+        output = BytesIO()
+        writer(symbol_array, output, zoom, border)
+        return output.getvalue()
+    if hasattr(output, 'write'):
+        writer(symbol_array, output, zoom, border)
+        return None
+    output = BufferWriter(output)
+    writer(symbol_array, output, zoom, border)
+    return output.position
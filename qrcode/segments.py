@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""Splits the input string in data segments of different modes so that the
+resulting bit stream is as short as possible (ISO/IEC 18004 8.4.7 and
+Annex J)."""
+
+from bisect import bisect_left
+
+from numpy import array, asarray, int64, searchsorted
+
+from qrreference import ecl_index, symbol_versions
+
+from qrutils import (
+        CLASS_8BIT,
+        CLASS_ALPHANUMERIC,
+        CLASS_LOWERCASE,
+        CLASS_NUMERIC,
+        class_runs,
+        classify,
+        max_databits,
+        num_char_count_indicator_bits)
+
+#: Modes the segmenter chooses between, from the most to the least compact.
+SEGMENT_MODES = ('numeric', 'alphanumeric', '8bit')
+
+#: Bits per character of each mode, in sixths of a bit.
+CHAR_COSTS = {'numeric': 20, 'alphanumeric': 33, '8bit': 48}
+
+#: First version of each range sharing the same character count indicator
+#  lengths (ISO/IEC 18004 Table 3), with the last version of the range.
+VERSION_RANGES = ((1, 9), (10, 26), (27, 40))
+
+#: Data bit capacity of versions 1 to 40 for each error correction level.
+DATA_BIT_CAPACITY = dict((ecl, [max_databits(version, ecl)
+    for version in symbol_versions]) for ecl in ecl_index)
+
+#: Bits left to the characters of a single segment in versions 1 to 40, once
+#  mode and character count indicators are accounted, for each (mode, error
+#  correction level).
+SEGMENT_BIT_CAPACITY = dict(((data_mode, ecl), array([
+    DATA_BIT_CAPACITY[ecl][version - 1] - 4 -
+    num_char_count_indicator_bits(version, data_mode)
+    for version in symbol_versions])) for data_mode in SEGMENT_MODES
+    for ecl in ecl_index)
+
+
+#: Indexes in SEGMENT_MODES of the modes able to encode each character class
+#  (lower case letters only when the string is folded to upper case).
+CLASS_MODES = {
+        CLASS_NUMERIC: (0, 1, 2),
+        CLASS_ALPHANUMERIC: (1, 2),
+        CLASS_LOWERCASE: (2,),
+        CLASS_8BIT: (2,),
+        }
+
+
+def data_bit_length(data_mode, length):
+    """Returns the number of bits needed to encode length characters in
+    data_mode, indicators excluded.
+
+    >>> data_bit_length('numeric', 8), data_bit_length('alphanumeric', 5)
+    (27, 28)
+
+    """
+    return (CHAR_COSTS[data_mode] * length + 5) // 6
+
+
+def segments_bit_length(segments, version):
+    """Returns the length of the bit stream encoding a list of (mode, text)
+    segments in a given symbol version, indicators included."""
+    return sum(4 + num_char_count_indicator_bits(version, data_mode) +
+            data_bit_length(data_mode, len(text))
+            for data_mode, text in segments)
+
+
+def split_long_segments(segments, version):
+    """Split segments longer than their character count indicator can hold."""
+    result = []
+    for data_mode, text in segments:
+        limit = (1 << num_char_count_indicator_bits(version, data_mode)) - 1
+        for start in range(0, len(text), limit):
+            result.append((data_mode, text[start:start + limit]))
+    return result
+
+
+def optimal_segments(input_string, version, runs=None):
+    """Returns the list of (mode, text) segments encoding input_string in the
+    fewest bits for a given symbol version.
+
+    runs are the character class runs of input_string, as returned by
+    :func:`qrcode.qrutils.class_runs`; they are computed when not given.
+
+    Costs are tracked in sixths of a bit so that every mode has an integer
+    cost per character; a segment is rounded up to a whole number of bits
+    when another one starts after it.
+
+    >>> optimal_segments('123456789012345678901234', 1)
+    [('numeric', '123456789012345678901234')]
+    >>> optimal_segments('ABC123456789012345@', 1)
+    [('alphanumeric', 'ABC'), ('numeric', '123456789012345'), ('8bit', '@')]
+
+    """
+    if not input_string:
+        return []
+    if runs is None:
+        runs = class_runs(classify(input_string)[1])
+    head_costs = [(4 + num_char_count_indicator_bits(version, data_mode)) * 6
+            for data_mode in SEGMENT_MODES]
+    costs = head_costs[:]
+    # previous_modes[i][j] is the mode of character i on the cheapest
+    # encoding of the first i + 1 characters ending in mode j
+    previous_modes = []
+    char_costs = [CHAR_COSTS[data_mode] for data_mode in SEGMENT_MODES]
+    for run_class, run_length in runs:
+        modes = CLASS_MODES[run_class]
+        for _count in range(run_length):
+            current_costs = [None] * len(SEGMENT_MODES)
+            current_modes = [None] * len(SEGMENT_MODES)
+            for j in modes:
+                current_costs[j] = costs[j] + char_costs[j]
+                current_modes[j] = j
+            # start a new segment in mode j after this character
+            for j in range(len(SEGMENT_MODES)):
+                for k in modes:
+                    cost = (current_costs[k] + 5) // 6 * 6 + head_costs[j]
+                    if current_costs[j] is None or cost < current_costs[j]:
+                        current_costs[j] = cost
+                        current_modes[j] = k
+            previous_modes.append(current_modes)
+            costs = current_costs
+
+    mode = min(range(len(SEGMENT_MODES)), key=lambda j: (costs[j] + 5) // 6)
+    char_mode_indexes = []
+    for current_modes in reversed(previous_modes):
+        mode = current_modes[mode]
+        char_mode_indexes.append(mode)
+    char_mode_indexes.reverse()
+
+    segments = []
+    start = 0
+    for i in range(1, len(input_string) + 1):
+        if (i == len(input_string) or
+                char_mode_indexes[i] != char_mode_indexes[start]):
+            segments.append((SEGMENT_MODES[char_mode_indexes[start]],
+                input_string[start:i]))
+            start = i
+    return split_long_segments(segments, version)
+
+
+def plan_version(payload_bits, ecl):
+    """Returns the smallest symbol version holding payload_bits bits, mode and
+    character count indicators included, at a given error correction level.
+
+    >>> plan_version(152, 'L'), plan_version(153, 'L')
+    (1, 2)
+
+    """
+    version = bisect_left(DATA_BIT_CAPACITY[ecl], payload_bits) + 1
+    if version > len(symbol_versions):
+        raise Exception("String is too long!")
+    return version
+
+
+def plan_versions(lengths, data_mode, ecl):
+    """Vectorized version selection for many single segment payloads.
+
+    :param lengths: an array of payload lengths in characters
+    :param data_mode: the mode all payloads are encoded in
+    :param ecl: the error correction level
+
+    Returns an array with the smallest symbol version of each payload, 0 for
+    payloads too long for any version.
+
+    >>> plan_versions([1, 41, 42, 10000], 'numeric', 'L').tolist()
+    [1, 1, 2, 0]
+
+    """
+    bits = (CHAR_COSTS[data_mode] * asarray(lengths, dtype=int64) + 5) // 6
+    versions = searchsorted(SEGMENT_BIT_CAPACITY[(data_mode, ecl)], bits) + 1
+    versions[versions > len(symbol_versions)] = 0
+    return versions
+
+
+def segment(input_string, ecl, symbol_version=None):
+    """Returns the smallest symbol version able to hold input_string at the
+    given error correction level, together with its optimal segments.
+
+    If symbol_version is given, the segments are computed for that version,
+    which is returned unless input_string does not fit in it.
+
+    Strings made only of alphanumeric characters in either case are folded to
+    upper case, as :func:`qrcode.qrutils.determine_datatype` always did;
+    otherwise lower case letters are kept in 8bit segments.
+
+    >>> segment('hello world', 'Q')
+    (1, [('alphanumeric', 'HELLO WORLD')])
+    >>> segment('', 'Q')
+    (1, [('alphanumeric', '')])
+
+    """
+    data_mode, classes = classify(input_string)
+    if data_mode == 'alphanumeric':
+        input_string = input_string.upper()
+        classes = classes.replace(CLASS_LOWERCASE, CLASS_ALPHANUMERIC)
+    if not input_string:
+        # a single empty segment, so that the symbol still has a mode
+        return symbol_version or 1, [(data_mode, input_string)]
+    runs = class_runs(classes)
+    if symbol_version is not None:
+        segments = optimal_segments(input_string, symbol_version, runs)
+        if (segments_bit_length(segments, symbol_version) >
+                DATA_BIT_CAPACITY[ecl][symbol_version - 1]):
+            raise Exception("String is too long!")
+        return symbol_version, segments
+    for first, last in VERSION_RANGES:
+        segments = optimal_segments(input_string, first, runs)
+        bit_length = segments_bit_length(segments, first)
+        if bit_length <= DATA_BIT_CAPACITY[ecl][last - 1]:
+            return max(plan_version(bit_length, ecl), first), segments
+    raise Exception("String is too long!")
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Writes finished symbols as SVG images.
+
+Horizontal runs of dark modules are merged, so that the image is a single
+path with one rectangle per run:
+
+>>> from io import BytesIO
+>>> from numpy import array
+>>> output = BytesIO()
+>>> write_svg(array([[1, 1, 0], [0, 7, 6], [9, 1, 1]]), output, border=1)
+>>> print output.getvalue().splitlines()[-3]
+<path d="M1 1h2v1h-2zM2 2h1v1h-1zM2 3h2v1h-2z"/>
+
+"""
+
+from numpy import asarray, concatenate, diff, int8, nonzero, zeros
+
+from qrdraw import QUIET_ZONE_WIDTH, dark_modules
+
+SVG_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+        'width="%(size)d" height="%(size)d" viewBox="0 0 %(side)d %(side)d" '
+        'shape-rendering="crispEdges">\n'
+        '<rect width="%(side)d" height="%(side)d" fill="%(light)s"/>\n'
+        '<g fill="%(dark)s">\n')
+
+SVG_FOOTER = '</g>\n</svg>\n'
+
+
+def dark_runs(symbol_array):
+    """Returns three arrays with the row, first column and length of every
+    horizontal run of dark modules, in reading order.
+
+    >>> [run.tolist() for run in dark_runs([[1, 1, 0, 7], [0, 0, 0, 0]])]
+    [[0, 0], [0, 3], [2, 1]]
+
+    """
+    dark = dark_modules(asarray(symbol_array)).astype(int8)
+    edge = zeros((dark.shape[0], 1), dtype=int8)
+    changes = diff(concatenate((edge, dark, edge), axis=1), axis=1)
+    rows, starts = nonzero(changes == 1)
+    _rows, ends = nonzero(changes == -1)
+    return rows, starts, ends - starts
+
+
+def write_svg(symbol_array, output, zoom=1, border=QUIET_ZONE_WIDTH,
+        dark='#000', light='#fff'):
+    """Writes a symbol as an SVG image.
+
+    :param symbol_array: a symbol array as returned by
+                         :func:`qrcode.qrdraw.make_array`
+    :param output: a file-like object to write to
+    :param zoom: the side of a module in pixels
+    :param border: the width of the quiet zone in modules
+    :param dark: the fill color of dark modules
+    :param light: the fill color of the background
+
+    Coordinates are in modules; one path command list is written per row of
+    the symbol, with a relative move between the runs of the same row.
+    """
+    side = symbol_array.shape[0] + 2 * border
+    output.write(SVG_HEADER % {'size': side * zoom, 'side': side,
+        'dark': dark, 'light': light})
+    output.write('<path d="')
+    rows, starts, lengths = dark_runs(symbol_array)
+    last_row = last_start = None
+    commands = []
+    for row, start, length in zip(rows.tolist(), starts.tolist(),
+            lengths.tolist()):
+        if row == last_row:
+            commands.append('m%d 0h%dv1h-%dz' % (start - last_start,
+                length, length))
+        else:
+            if commands:
+                output.write(''.join(commands))
+                commands = []
+            commands.append('M%d %dh%dv1h-%dz' % (start + border,
+                row + border, length, length))
+            last_row = row
+        last_start = start
+    output.write(''.join(commands))
+    output.write('"/>\n')
+    output.write(SVG_FOOTER)
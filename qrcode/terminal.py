@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Writes finished symbols as text for terminals.
+
+Every line of text holds two rows of modules with the Unicode half block
+characters; lines are written one at a time, so that even large symbols
+appear at once and PIL is never involved.
+
+>>> from matrix import PackedMatrix
+>>> from numpy import packbits
+>>> matrix = PackedMatrix(2, packbits([[1, 0], [1, 1]], axis=1))
+>>> list(text_lines(matrix, border=0))
+[u'\\u2588\\u2584']
+
+"""
+
+from numpy import zeros
+
+from qrdraw import QUIET_ZONE_WIDTH
+
+#: Characters for the four combinations of an upper and a lower module, the
+#  upper one being the most significant bit, 1 standing for a dark module.
+HALF_BLOCKS = (u' ', u'▄', u'▀', u'█')
+
+#: Characters of a light and a dark module where half blocks can not be
+#  encoded: two per module, for square modules, and one row of modules per
+#  line.
+ASCII_MODULES = (u'  ', u'##')
+
+#: ANSI escape sequences around inverted lines, see write_text.
+ANSI_INVERSE = u'\x1b[7m'
+ANSI_RESET = u'\x1b[0m'
+
+
+def text_lines(matrix, border=QUIET_ZONE_WIDTH, invert=False):
+    """Yields the lines of text of a :class:`qrcode.matrix.PackedMatrix`, two
+    rows of modules each, without line endings.
+
+    :param border: the width of the quiet zone in modules
+    :param invert: swap dark and light modules, for terminals drawing light
+                   characters on a dark background
+    """
+    dark = matrix.dark()
+    side = matrix.side + 2 * border
+    framed = zeros((side + side % 2, side), dtype=bool)
+    framed[border:border + matrix.side, border:border + matrix.side] = dark
+    if invert:
+        framed[:side] = ~framed[:side]
+    # two bit codes, upper module first, of every column of every line
+    codes = framed[0::2] * 2 + framed[1::2]
+    for line in codes:
+        yield u''.join([HALF_BLOCKS[code] for code in line])
+
+
+def ascii_lines(matrix, border=QUIET_ZONE_WIDTH, invert=False):
+    """Yields the lines of text of a :class:`qrcode.matrix.PackedMatrix`
+    drawn with ASCII_MODULES, one row of modules each, without line endings.
+
+    :param border: the width of the quiet zone in modules
+    :param invert: swap dark and light modules
+    """
+    side = matrix.side + 2 * border
+    framed = zeros((side, side), dtype=bool)
+    framed[border:border + matrix.side, border:border + matrix.side] = (
+            matrix.dark())
+    if invert:
+        framed = ~framed
+    for line in framed:
+        yield u''.join([ASCII_MODULES[dark] for dark in line])
+
+
+def can_encode_half_blocks(encoding):
+    """Tells whether HALF_BLOCKS can be written in encoding.
+
+    >>> can_encode_half_blocks('utf-8'), can_encode_half_blocks('ascii')
+    (True, False)
+
+    """
+    try:
+        u''.join(HALF_BLOCKS).encode(encoding)
+    except (UnicodeError, LookupError):
+        return False
+    return True
+
+
+def write_text(matrix, output, border=QUIET_ZONE_WIDTH, invert=False,
+        ansi=False, encoding=None):
+    """Writes a symbol to a stream, such as sys.stdout, one encoded line at a
+    time.
+
+    :param matrix: a :class:`qrcode.matrix.PackedMatrix`
+    :param output: the stream to write to
+    :param border: the width of the quiet zone in modules
+    :param invert: swap dark and light modules, see text_lines
+    :param ansi: wrap lines in ANSI reverse video escapes, so that on
+                 terminals drawing light characters on a dark background
+                 dark modules are drawn in the background color
+    :param encoding: the encoding of the lines; defaults to the encoding of
+                     output, UTF-8 if it has none
+
+    If encoding can not encode the half block characters, as with ASCII in
+    the C locale, the symbol is drawn with ASCII_MODULES instead.
+    """
+    encoding = encoding or getattr(output, 'encoding', None) or 'utf-8'
+    if can_encode_half_blocks(encoding):
+        lines = text_lines(matrix, border, invert)
+    else:
+        lines = ascii_lines(matrix, border, invert)
+    flush = getattr(output, 'flush', None)
+    for line in lines:
+        if ansi:
+            line = ANSI_INVERSE + line + ANSI_RESET
+        output.write((line + u'\n').encode(encoding))
+        if flush is not None:
+            flush()
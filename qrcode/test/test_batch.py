@@ -0,0 +1,66 @@
+from qrcode.batch import IN_FLIGHT_CHUNKS, encode_many, encode_one
+from qrcode.qrcode import Encoder
+
+PAYLOADS = ['payload %d' % i for i in range(50)] + ['0123456789' * 30]
+
+
+def test_encode_one():
+    assert encode_one('HELLO', 'M') == Encoder('HELLO', 'M').make_matrix()
+    assert encode_one('HELLO', 'M', format='svg', zoom=2) == Encoder(
+            'HELLO', 'M').render(format='svg', zoom=2)
+
+
+def test_encode_many_in_process():
+    results = list(encode_many(PAYLOADS, 'M', workers=1))
+    assert results == [encode_one(payload, 'M') for payload in PAYLOADS]
+    unordered = list(encode_many(PAYLOADS, 'M', workers=1, ordered=False))
+    assert unordered == list(enumerate(results))
+
+
+def test_encode_many_pool():
+    expected = list(encode_many(iter(PAYLOADS), 'H', workers=1))
+    assert list(encode_many(iter(PAYLOADS), 'H', workers=2,
+        chunksize=8)) == expected
+    unordered = sorted(encode_many(iter(PAYLOADS), 'H', workers=2,
+        chunksize=8, ordered=False))
+    assert unordered == list(enumerate(expected))
+
+
+def test_encode_many_images():
+    images = list(encode_many(PAYLOADS[:5], workers=2, format='png', zoom=2))
+    assert images == [encode_one(payload, format='png', zoom=2)
+            for payload in PAYLOADS[:5]]
+
+
+def test_encode_many_bounds_payloads_in_flight():
+    consumed = []
+
+    def payloads():
+        for i in range(300):
+            consumed.append(i)
+            yield 'payload %d' % i
+
+    limit = 2 * 2 * IN_FLIGHT_CHUNKS
+    for ordered in (True, False):
+        del consumed[:]
+        results = encode_many(payloads(), workers=2, chunksize=2,
+                ordered=ordered)
+        yielded = []
+        for result in results:
+            yielded.append(result)
+            assert len(consumed) <= len(yielded) + limit + 1
+            if len(yielded) == 100:
+                break
+        results.close()
+        if ordered:
+            assert yielded == [encode_one('payload %d' % i)
+                    for i in range(100)]
+        else:
+            assert all(result == encode_one('payload %d' % index)
+                    for index, result in yielded)
+
+
+def test_encode_many_all_results():
+    results = list(encode_many(('payload %d' % i for i in range(200)),
+        workers=3, chunksize=4))
+    assert results == [encode_one('payload %d' % i) for i in range(200)]
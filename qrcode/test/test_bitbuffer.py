@@ -0,0 +1,26 @@
+from qrcode.bitbuffer import BitBuffer
+
+def test_append():
+    buf = BitBuffer()
+    buf.append(5, 3)
+    buf.append(1023, 10)
+    buf.append(0, 4)
+    buf.append(0x1ff, 9)
+    assert len(buf) == 26
+    assert str(buf) == '10111111111110000111111111'
+    assert buf.to_binstring(5) == '10111'
+
+def test_append_truncates_value():
+    buf = BitBuffer()
+    buf.append(0xfff, 4)
+    assert str(buf) == '1111'
+
+def test_append_bytes():
+    buf = BitBuffer()
+    buf.append_bytes(bytearray([236, 17]))
+    buf.append(1, 1)
+    buf.append_bytes(bytearray([236]))
+    assert str(buf) == '11101100' '00010001' '1' '11101100'
+    buf.pad_to_byte()
+    assert len(buf) == 32
+    assert list(buf.to_bytes()) == [236, 17, 246, 0]
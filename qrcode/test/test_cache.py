@@ -0,0 +1,88 @@
+from threading import Thread
+
+from qrcode.cache import RenderCache
+from qrcode.qrcode import Encoder
+
+
+def test_render_cache_hits():
+    cache = RenderCache()
+    data = cache.render('hello world', 'Q', format='svg', zoom=2)
+    assert data == Encoder('hello world', 'Q').render(format='svg', zoom=2)
+    assert cache.render('hello world', 'Q', format='svg', zoom=2) is data
+    cache.render('hello world', 'Q', format='svg', zoom=3)
+    cache.render('hello world', 'Q', format='svg', zoom=2, border=1)
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 0)
+    assert len(cache) == 3
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_render_cache_entry_limit():
+    cache = RenderCache(max_entries=2)
+    cache.render('A')
+    cache.render('B')
+    cache.render('A')
+    cache.render('C')
+    assert cache.evictions == 1
+    assert list(key[0] for key in cache.entries) == ['A', 'C']
+
+
+def test_render_cache_byte_limit():
+    size = len(Encoder('A').render(format='pbm', zoom=1))
+    cache = RenderCache(max_bytes=2 * size)
+    for payload in 'ABC':
+        cache.render(payload, format='pbm', zoom=1)
+    assert len(cache) == 2 and cache.nbytes == 2 * size
+    assert cache.evictions == 1
+    cache.render('D', format='pbm', zoom=10)
+    assert len(cache) == 2 and cache.evictions == 1
+
+
+def test_render_cache_threads():
+    cache = RenderCache(max_entries=4)
+    payloads = ['payload %d' % (i % 6) for i in range(60)]
+
+    def work():
+        for payload in payloads:
+            cache.render(payload, format='txt')
+
+    threads = [Thread(target=work) for _i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.hits + cache.misses == 240
+    assert len(cache) <= 4
+    assert cache.nbytes == sum(len(data) for data in cache.entries.values())
+
+
+def test_render_cache_threads_match_single_thread():
+    import sys
+    jobs = [(payload * repeat, ecl) for payload in ('HELLO', 'hello', '123')
+            for repeat in (1, 12, 40) for ecl in 'LMQH']
+    expected = dict((job, Encoder(job[0], job[1]).render(format='pbm',
+        zoom=1)) for job in jobs)
+    cache = RenderCache(max_entries=8)
+    errors = []
+
+    def work(offset):
+        try:
+            for job in jobs[offset:] + jobs[:offset]:
+                data = cache.render(job[0], job[1], format='pbm', zoom=1)
+                assert data == expected[job]
+        except Exception as error:
+            errors.append(error)
+
+    interval = sys.getcheckinterval()
+    sys.setcheckinterval(1)
+    try:
+        threads = [Thread(target=work, args=(3 * i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setcheckinterval(interval)
+    assert not errors
+    assert cache.hits + cache.misses == 8 * len(jobs)
+    assert len(set(len(data) for data in expected.values())) > 1
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from qrcode.gf import GaloisField
+from qrcode.gf import CompactGFPoly, GFPoly, GaloisField
 
 def test_gf_add():
     gf = GaloisField()
@@ -18,3 +18,84 @@ def test_gf_multiply():
     gf = GaloisField(256, 301)
     assert gf.multiply(14, 33) == 227
 
+
+def test_gf_product_tables():
+    gf = GaloisField()
+    for op1 in range(256):
+        for op2 in range(1, 256):
+            expected = gf.alog[(gf.log[op1] + gf.log[op2]) % 255] if op1 else 0
+            assert gf.multiply(op1, op2) == expected
+            assert gf.quotient(expected, op2) == op1
+        if op1:
+            assert gf.multiply(op1, gf.inverse(op1)) == 1
+
+def test_compact_gfpoly_arithmetic():
+    gf = GaloisField()
+    a = CompactGFPoly(gf, [0, 3, 7, 1])
+    b = CompactGFPoly(gf, [5, 2])
+    assert list(a.get_coefficients()) == [3, 7, 1]
+    assert list((a + b).coefficients) == [3, 2, 3]
+    product = a * b
+    assert list(product.coefficients) == list((GFPoly(gf, [3, 7, 1]) *
+        GFPoly(gf, [5, 2])).coefficients)
+    quotient, remainder = product / b
+    assert list(quotient.coefficients) == [3, 7, 1]
+    assert remainder.is_zero()
+    a += a
+    assert a.is_zero()
+
+def test_compact_gfpoly_evaluate_at():
+    gf = GaloisField()
+    poly = CompactGFPoly(gf, [3, 7, 1])
+    assert poly.evaluate_at(0) == 1
+    assert poly.evaluate_at(1) == 3 ^ 7 ^ 1
+    assert poly.evaluate_at(2) == gf.multiply(3, 4) ^ gf.multiply(7, 2) ^ 1
+
+def test_gf_generator_polynomial():
+    from qrcode.test.generator_polynomials import generator_polynomials
+    gf = GaloisField()
+    for degree in generator_polynomials:
+        assert gf.generator_polynomial(degree) == tuple(
+                generator_polynomials[degree])
+    assert len(gf.generator_polynomial(100)) == 101
+
+def test_gf_generator_polynomial_cache():
+    from qrcode.gf import GENERATOR_CACHE_SIZE
+    gf = GaloisField()
+    for degree in range(1, GENERATOR_CACHE_SIZE + 5):
+        gf.generator_polynomial(degree)
+    assert len(gf.generators) == GENERATOR_CACHE_SIZE
+    assert 1 not in gf.generators
+
+def test_gf_generator_polynomial_threads():
+    import sys
+    from threading import Thread
+    from qrcode.gf import GENERATOR_CACHE_SIZE
+    reference = GaloisField()
+    degrees = range(1, GENERATOR_CACHE_SIZE + 17)
+    expected = dict((degree, reference.generator_polynomial(degree))
+            for degree in degrees)
+    gf = GaloisField()
+    errors = []
+
+    def work(offset):
+        try:
+            for _round in range(20):
+                for degree in degrees[offset:] + degrees[:offset]:
+                    assert gf.generator_polynomial(degree) == expected[degree]
+        except Exception as error:
+            errors.append(error)
+
+    interval = sys.getcheckinterval()
+    sys.setcheckinterval(1)
+    try:
+        threads = [Thread(target=work, args=(5 * i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setcheckinterval(interval)
+    assert not errors
+    assert len(gf.generators) == GENERATOR_CACHE_SIZE
+    assert len(list(gf.generators)) == GENERATOR_CACHE_SIZE
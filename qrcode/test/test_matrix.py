@@ -0,0 +1,28 @@
+import pickle
+
+from qrcode.matrix import PackedMatrix
+from qrcode.qrcode import Encoder
+from qrcode.qrdraw import dark_modules, make_array
+
+def test_packed_matrix_round_trip():
+    e = Encoder('9' * 7000, 'L')
+    symbol_array = make_array(e)
+    matrix = PackedMatrix.from_array(symbol_array)
+    assert matrix.symbol_version == 40
+    assert matrix.rows.shape == (177, 23)
+    assert matrix.nbytes == 177 * 23
+    assert (matrix.dark() == dark_modules(symbol_array)).all()
+    assert PackedMatrix.from_bytes(177, matrix.tobytes()) == matrix
+
+def test_function_modules():
+    matrix = Encoder('01234567', 'L').make_matrix()
+    function_modules = matrix.function_modules()
+    assert function_modules.shape == (21, 21)
+    assert function_modules[0][0] and not function_modules[20][20]
+    assert function_modules is PackedMatrix.from_array(
+            make_array(Encoder('1', 'H'))).function_modules()
+
+def test_pickle():
+    matrix = Encoder('hello world', 'Q').make_matrix()
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        assert pickle.loads(pickle.dumps(matrix, protocol)) == matrix
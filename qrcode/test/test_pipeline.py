@@ -0,0 +1,38 @@
+import os
+import shutil
+from io import BytesIO
+from tempfile import mkdtemp
+
+from nose.tools import raises
+
+from qrcode.pipeline import render_many
+from qrcode.qrcode import Encoder
+
+PAYLOADS = ['payload %d' % i for i in range(40)]
+
+
+def test_render_many_streams():
+    outputs = [BytesIO() for _payload in PAYLOADS]
+    count = render_many(zip(PAYLOADS, outputs), zoom=2, threads=3,
+            queue_size=2)
+    assert count == len(PAYLOADS)
+    for payload, output in zip(PAYLOADS, outputs):
+        assert output.getvalue() == Encoder(payload).render(zoom=2)
+
+
+def test_render_many_paths():
+    directory = mkdtemp()
+    try:
+        paths = [os.path.join(directory, '%d.svg' % i) for i in range(5)]
+        assert render_many(zip(PAYLOADS, paths), format='svg', ecl='H') == 5
+        for payload, path in zip(PAYLOADS, paths):
+            with open(path, 'rb') as svg:
+                assert svg.read() == Encoder(payload, 'H').render(format='svg')
+    finally:
+        shutil.rmtree(directory)
+
+
+@raises(Exception)
+def test_render_many_error():
+    jobs = [(payload, bytearray(10)) for payload in PAYLOADS]
+    render_many(jobs, threads=2)
@@ -0,0 +1,38 @@
+from io import BytesIO
+
+from PIL import Image
+
+from qrcode.matrix import PackedMatrix
+from qrcode.png import PNG_SIGNATURE, write_png
+from qrcode.qrcode import Encoder
+from qrcode.qrdraw import make_array, quiet_zone
+from qrcode.qrutils import raster
+
+
+def decode(data):
+    image = Image.open(BytesIO(data))
+    image.load()
+    return image
+
+
+def test_write_png_matches_raster():
+    for payload, zoom, border in (('HELLO', 1, 4), ('hello world', 3, 0),
+            ('0123456789' * 20, 5, 2)):
+        symbol_array = make_array(Encoder(payload, 'M'))
+        output = BytesIO()
+        write_png(PackedMatrix.from_array(symbol_array), output, zoom, border)
+        data = output.getvalue()
+        assert data.startswith(PNG_SIGNATURE)
+        image = decode(data)
+        assert image.mode == '1'
+        expected = raster(quiet_zone(symbol_array, border), zoom)
+        assert image.size == expected.shape[::-1]
+        assert image.convert('L').tobytes() == expected.tostring()
+
+
+def test_write_png_large_zoom():
+    matrix = Encoder('HELLO', 'M').make_matrix()
+    output = BytesIO()
+    write_png(matrix, output, zoom=200, compression=0)
+    assert output.getvalue().count(b'IDAT') > 1
+    assert decode(output.getvalue()).size == (5800, 5800)
@@ -0,0 +1,44 @@
+from io import BytesIO
+
+from PIL import Image
+
+from qrcode.matrix import PackedMatrix
+from qrcode.pnm import write_pbm, write_pgm
+from qrcode.qrcode import Encoder
+from qrcode.qrdraw import make_array, quiet_zone
+from qrcode.qrutils import raster
+
+
+def test_write_pbm_and_pgm_match_raster():
+    for payload, zoom, border in (('HELLO', 1, 4), ('hello world', 3, 0),
+            ('0123456789' * 20, 2, 1)):
+        symbol_array = make_array(Encoder(payload, 'Q'))
+        matrix = PackedMatrix.from_array(symbol_array)
+        expected = raster(quiet_zone(symbol_array, border), zoom)
+        for writer, mode in ((write_pbm, '1'), (write_pgm, 'L')):
+            output = BytesIO()
+            writer(matrix, output, zoom, border)
+            image = Image.open(BytesIO(output.getvalue()))
+            assert image.mode == mode
+            assert image.size == expected.shape[::-1]
+            assert image.convert('L').tobytes() == expected.tostring()
+
+
+def test_write_pbm_size():
+    matrix = Encoder('HELLO', 'L').make_matrix()
+    output = BytesIO()
+    write_pbm(matrix, output, zoom=8)
+    assert output.getvalue().startswith(b'P4\n232 232\n')
+    assert len(output.getvalue()) == 11 + 232 * 29
+
+
+def test_write_pbm_packed_rows():
+    matrix = Encoder('9' * 7000, 'L').make_matrix()
+    for border in (0, 1, 4, 8, 13, 16):
+        output = BytesIO()
+        write_pbm(matrix, output, 1, border)
+        side = matrix.side + 2 * border
+        expected = b'P4\n%d %d\n' % (side, side) + b''.join(
+                row.tostring() * count
+                for row, count in matrix.scaled_rows(1, border))
+        assert output.getvalue() == expected
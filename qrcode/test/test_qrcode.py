@@ -1,6 +1,7 @@
 from nose.tools import raises
 
-from qrcode.qrcode import Encoder
+from qrcode.qrcode import Encoder, SymbolWriter
+from qrcode.qrdraw import make_array
 
 def test_numeric_encoder():
     e = Encoder('01234567', 'L')
@@ -25,3 +26,41 @@ def test_pad():
     e = Encoder('12341234123412341234', 'H')
     e.pad()
 
+
+def test_mixed_segments():
+    e = Encoder('A' + '0123456789' * 10, 'L')
+    assert e.data_mode == 'mixed'
+    assert e.segments == [('alphanumeric', 'A'), ('numeric', '0123456789' * 10)]
+    assert e.symbol_version == 3
+    assert e.code.startswith('0010' '000000001' '001010' '0001' '0001100100')
+
+
+def test_fixed_symbol_version():
+    e = Encoder('01234567', 'L', symbol_version=4)
+    assert e.symbol_version == 4
+    assert len(e.final_sequence) == 100
+
+
+@raises(Exception)
+def test_fixed_symbol_version_too_small():
+    Encoder('0123456789' * 5, 'L', symbol_version=1)
+
+
+def test_symbol_writer():
+    payloads = ['HELLO WORLD', 'hello world', '01234567', 'AC-42',
+            'a longer payload, 123']
+    for mask_policy in ('exhaustive', 'heuristic', '011'):
+        writer = SymbolWriter(2, 'M', mask_policy)
+        for payload in payloads:
+            written = writer.write(payload)
+            code = Encoder(payload, 'M', mask_policy, symbol_version=2)
+            assert (written == make_array(code)).all()
+            assert writer.mask_pattern == code.mask_pattern
+            assert writer.write_matrix(payload) == code.make_matrix()
+
+
+def test_empty_input():
+    e = Encoder('', 'L')
+    assert e.data_mode == 'alphanumeric'
+    assert e.segments == [('alphanumeric', '')]
+    assert e.code == '00100000000000000'
@@ -0,0 +1,137 @@
+from qrcode.qrcode import Encoder
+from qrcode.qrdraw import (
+        TEMPLATES,
+        make_array,
+        mask_planes,
+        place_data,
+        placement_order,
+        quiet_zone,
+        symbol_template,
+        warm_templates)
+
+def test_symbol_template_cached():
+    template = symbol_template(7)
+    assert template is symbol_template(7)
+    assert template.dtype.name == 'uint8'
+    assert template.shape == (45, 45)
+    assert not template.flags.writeable
+    # version information in the lower left corner
+    assert [template[-11][0], template[-10][0], template[-9][0]] == [6, 6, 6]
+
+def test_make_array_leaves_template_untouched():
+    e = Encoder('01234567', 'L')
+    template = symbol_template(1).copy()
+    make_array(e)
+    assert (symbol_template(1) == template).all()
+
+def test_warm_templates():
+    warm_templates([38, 39])
+    assert 38 in TEMPLATES and 39 in TEMPLATES
+
+def test_placement_order_covers_encoding_region():
+    from qrcode.qrreference import symbol_version_data
+    for version in (1, 2, 7, 40):
+        order = placement_order(version)
+        data = symbol_version_data[version]
+        assert len(order) == (data['data_capacity'] * 8 +
+                data['remainder_bits'])
+        assert len(set(order.tolist())) == len(order)
+        assert (symbol_template(version).flat[order] == 9).all()
+    # placement starts from the bottom right corner
+    assert placement_order(1)[:4].tolist() == [440, 439, 419, 418]
+
+def test_mask_planes():
+    planes = mask_planes(2)
+    assert planes.shape == (8, 25, 25)
+    assert planes.dtype.name == 'bool'
+    encoding_region = symbol_template(2) == 9
+    assert not (planes & ~encoding_region).any()
+    # row 9 column 10 is in the encoding region
+    assert [int(plane[9][10]) for plane in planes] == [0, 0, 0, 0, 0, 1, 1, 0]
+
+def test_apply_masking_only_touches_data_modules():
+    from qrcode.qrdraw import apply_masking
+    array = symbol_template(1).copy()
+    array[array == 9] = 0
+    masked, pattern = apply_masking(array.copy(), '011')
+    assert pattern == '011'
+    changed = masked != array
+    assert (array[changed] == 0).all()
+    assert changed.sum() == mask_planes(1)[3].sum()
+
+def naive_penalty(dark):
+    """Straightforward N1-N4 scoring of a single boolean symbol."""
+    side = len(dark)
+    lines = [list(row) for row in dark] + [list(col) for col in zip(*dark)]
+    n1 = n3 = 0
+    for line in lines:
+        run = 1
+        for prev, cur in zip(line, line[1:]) + [(None, None)]:
+            if cur is not None and cur == prev:
+                run += 1
+            else:
+                if run >= 5:
+                    n1 += run - 2
+                run = 1
+        padded = [False] * 4 + line + [False] * 4
+        for start in range(len(padded) - 10):
+            window = [int(x) for x in padded[start:start + 11]]
+            if window in ([1, 0, 1, 1, 1, 0, 1, 0, 0, 0, 0],
+                    [0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1]):
+                n3 += 40
+    n2 = 0
+    for i in range(side - 1):
+        for j in range(side - 1):
+            if (dark[i][j] == dark[i + 1][j] == dark[i][j + 1] ==
+                    dark[i + 1][j + 1]):
+                n2 += 3
+    dark_count = sum(sum(row) for row in dark)
+    n4 = abs(20 * dark_count - 10 * side * side) // (side * side) * 10
+    return [n1, n2, n3, n4]
+
+def test_penalty_scores_match_naive():
+    from qrcode.qrdraw import dark_modules, masked_candidates, penalty_scores
+    e = Encoder('http://example.com/', 'M')
+    unmasked = place_data(e, symbol_template(e.symbol_version).copy())
+    candidates = masked_candidates(unmasked, 'M')
+    scores = penalty_scores(candidates)
+    assert scores.shape == (8, 4)
+    for candidate, score in zip(candidates, scores):
+        dark = dark_modules(candidate).tolist()
+        assert score.tolist() == naive_penalty(dark)
+
+def test_make_array_selects_lowest_penalty():
+    e = Encoder('http://example.com/', 'M')
+    make_array(e)
+    totals = e.mask_scores.sum(axis=1)
+    assert totals[int(e.mask_pattern, 2)] == totals.min()
+
+def test_mask_policies():
+    e = Encoder('http://example.com/', 'M', mask_policy='011')
+    fixed = make_array(e)
+    assert e.mask_pattern == '011'
+    assert e.mask_scores is None
+    assert e.mask_scoring_time >= 0
+
+    heuristic = make_array(e, 'heuristic')
+    assert e.mask_scores.shape == (8, 4)
+    assert not e.mask_scores[:, 2].any()
+    totals = e.mask_scores.sum(axis=1)
+    assert totals[int(e.mask_pattern, 2)] == totals.min()
+
+    e.mask_policy = e.mask_pattern
+    assert (make_array(e) == heuristic).all()
+
+def test_unknown_mask_policy():
+    from nose.tools import assert_raises
+    e = Encoder('01234567', 'L', mask_policy='best')
+    assert_raises(Exception, make_array, e)
+
+
+def test_quiet_zone():
+    symbol_array = make_array(Encoder('HELLO', 'M'))
+    framed = quiet_zone(symbol_array)
+    assert framed.shape == (29, 29)
+    assert (framed[4:-4, 4:-4] == symbol_array).all()
+    assert not framed[:4].any() and not framed[:, -4:].any()
+    assert quiet_zone(symbol_array, 0).shape == (21, 21)
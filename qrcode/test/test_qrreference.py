@@ -1,5 +1,6 @@
 from qrcode.qrutils import data_codewords_per_block
-from qrcode.qrreference import blocks_per_ecl , generator_polynomials
+from qrcode.qrreference import blocks_per_ecl
+from qrcode.test.generator_polynomials import generator_polynomials
 
 def test_generator_polynomials_length():
     for key in generator_polynomials:
@@ -1,7 +1,10 @@
+import os
+
 from nose.tools import raises
 
 from qrcode.qrcode import Encoder
 from qrcode.qrutils import *
+from qrcode.qrreference import version_information_bit_string
 
 def test_bch_15_5():
     assert bch_15_5('00101') == '100000011001110'
@@ -63,7 +66,7 @@ def test_split_alphanumeric_mode():
     assert(split_numeric_input('') == [])
 
 def test_convert():
-    assert(convert('01234567', 'numeric') == '000000110001010110011000011')
+    assert(str(convert('01234567', 'numeric')) == '000000110001010110011000011')
 
 def test_pad():
     assert pad('0101', 5) == '01010'
@@ -109,3 +112,60 @@ def test_alphanumeric_reed_solomon():
 def test_8bit():
     a = Encoder('pink@thepallin.org', 'H')
     assert a.final_sequence
+
+def test_reed_solomon_matches_polynomial_division():
+    from qrcode.gf import GFPoly
+    from qrcode.test.generator_polynomials import generator_polynomials
+    data = [(x * 37 + 11) % 256 for x in range(60)]
+    for num_of_ec_words in generator_polynomials:
+        num = GFPoly(GF256, data).multiply_by_monomial(num_of_ec_words, 1)
+        den = GFPoly(GF256, [GF256.alpha_power(x) for x in
+            generator_polynomials[num_of_ec_words]])
+        _quotient, rem = num / den
+        expected = rem.coefficients
+        expected = [0] * (num_of_ec_words - len(expected)) + expected
+        assert reed_solomon(data, num_of_ec_words) == expected
+
+def test_reed_solomon_leading_zero():
+    a = Encoder('Z' * 1800, 'H')
+    for ec_block in a.ec_blocks:
+        assert len(ec_block) == 30
+
+def test_reed_solomon_blocks():
+    blocks = [[(x * y + 7) % 256 for x in range(length)]
+            for y, length in enumerate([43, 44, 44, 43, 20])]
+    ec_blocks = reed_solomon_blocks(stack_blocks(blocks), 26)
+    assert ec_blocks.shape == (5, 26)
+    for block, ec_block in zip(blocks, ec_blocks.tolist()):
+        assert ec_block == reed_solomon(block, 26)
+
+def test_format_information_table():
+    assert len(FORMAT_INFORMATION) == 32
+    assert bch_15_5('01000') == '111011111000100'
+    for data in range(32):
+        word = FORMAT_INFORMATION[data] ^ 0x5412
+        assert word >> 10 == data
+        assert bch_code(data, FORMAT_GENERATOR) == word
+
+def test_classify():
+    assert classify('') == ('alphanumeric', '')
+    assert classify('0123') == ('numeric', '0000')
+    assert classify('AbC 1') == ('alphanumeric', '12110')
+    assert classify(u'caf\xe9 \u20ac') == ('8bit', '222313')
+    assert class_runs('') == []
+
+def test_make_image():
+    symbol_array = array([[1, 0, 9], [6, 7, 8], [0, 0, 1]], dtype=uint8)
+    path, img = make_image(symbol_array, zoom=2, temporary=True)
+    assert img.mode == '1' and img.size == (6, 6)
+    assert img.getpixel((0, 0)) == 0 and img.getpixel((1, 1)) == 0
+    assert img.getpixel((2, 0)) == 255 and img.getpixel((5, 3)) == 255
+    raw_path, raw_img = make_image(list(symbol_array.flat), raw_list=True,
+            zoom=2, temporary=True)
+    assert raw_img.tobytes() == img.tobytes()
+    os.remove(path)
+    os.remove(raw_path)
+
+@raises(Exception)
+def test_make_image_needs_path():
+    make_image(array([[1]], dtype=uint8))
@@ -0,0 +1,80 @@
+import os
+from io import BytesIO
+
+from nose.tools import raises
+
+from qrcode.qrcode import Encoder
+from qrcode.qrdraw import make_array
+from qrcode.render import RENDERERS, render_symbol
+
+
+def test_render_targets():
+    symbol_array = make_array(Encoder('hello world', 'M'))
+    for format in RENDERERS:
+        data = render_symbol(symbol_array, format=format, zoom=3)
+        output = BytesIO()
+        assert render_symbol(symbol_array, output, format, 3) is None
+        assert output.getvalue() == data
+        buf = bytearray(len(data) + 10)
+        assert render_symbol(symbol_array, buf, format, 3) == len(data)
+        assert bytes(buf[:len(data)]) == data
+
+
+def test_render_formats():
+    symbol_array = make_array(Encoder('HELLO', 'L'))
+    assert render_symbol(symbol_array).startswith(b'\x89PNG')
+    pbm = render_symbol(symbol_array, format='pbm')
+    assert pbm.startswith(b'P4\n29 29\n') and len(pbm) == 9 + 29 * 4
+    assert b'<svg' in render_symbol(symbol_array, format='svg')
+
+
+@raises(Exception)
+def test_render_buffer_too_small():
+    render_symbol(make_array(Encoder('HELLO', 'L')), bytearray(100))
+
+
+@raises(Exception)
+def test_render_unknown_format():
+    render_symbol(make_array(Encoder('HELLO', 'L')), format='gif')
+
+
+def test_encoder_render_and_save_image():
+    e = Encoder('hello world', 'M')
+    data = e.render(format='svg')
+    path = e.save_image(temporary=True, format='svg')
+    try:
+        assert path.endswith('.svg')
+        assert open(path, 'rb').read() == data
+    finally:
+        os.remove(path)
+
+
+@raises(Exception)
+def test_save_image_needs_path():
+    Encoder('hello world', 'M').save_image()
+
+
+def test_save_image_failure_leaves_no_file():
+    import tempfile
+    directory = tempfile.mkdtemp()
+    tempfile.tempdir, previous = directory, tempfile.tempdir
+    try:
+        e = Encoder('hello world', 'M', mask_policy='nonexistent')
+        path = os.path.join(directory, 'symbol.png')
+        for kwargs in ({'path': path}, {'temporary': True}):
+            try:
+                e.save_image(**kwargs)
+            except Exception:
+                pass
+            else:
+                assert False, "save_image did not fail"
+        # a negative image size fails while writing the PNG header
+        e = Encoder('hello world', 'M')
+        try:
+            e.save_image(path, zoom=5, border=-100)
+        except Exception:
+            pass
+        assert os.listdir(directory) == []
+    finally:
+        tempfile.tempdir = previous
+        os.rmdir(directory)
@@ -0,0 +1,60 @@
+from qrcode.segments import (
+        optimal_segments,
+        plan_version,
+        plan_versions,
+        segment,
+        segments_bit_length,
+        split_long_segments)
+
+def test_single_mode_segments():
+    assert optimal_segments('01234567', 1) == [('numeric', '01234567')]
+    assert optimal_segments('AC-42', 1) == [('alphanumeric', 'AC-42')]
+    assert optimal_segments('a@b', 1) == [('8bit', 'a@b')]
+    assert optimal_segments('ab', 1) == [('8bit', 'ab')]
+    assert optimal_segments('', 1) == []
+
+def test_optimal_segments_bit_length():
+    input_string = 'test@example.org 0123456789012345678901234567890123'
+    segments = optimal_segments(input_string, 1)
+    assert ''.join(text for _mode, text in segments) == input_string
+    assert len(segments) > 1
+    assert (segments_bit_length(segments, 1) <
+            segments_bit_length([('8bit', input_string)], 1))
+
+def test_segment_shrinks_version():
+    version, segments = segment('X' + '1' * 200, 'M')
+    assert version == 6
+    assert segments == [('alphanumeric', 'X'), ('numeric', '1' * 200)]
+
+def test_segment_keeps_case():
+    version, segments = segment('pink@thepallin.org', 'H')
+    assert segments == [('8bit', 'pink@thepallin.org')]
+    version, segments = segment('abc-1', 'H')
+    assert segments == [('alphanumeric', 'ABC-1')]
+
+def test_split_long_segments():
+    segments = split_long_segments([('8bit', '@' * 300)], 1)
+    assert segments == [('8bit', '@' * 255), ('8bit', '@' * 45)]
+
+def test_plan_versions():
+    from qrcode.qrutils import max_char_capacity, max_databits
+    for data_mode in ('numeric', 'alphanumeric', '8bit'):
+        for ecl in 'LMQH':
+            lengths = range(1, 7100, 7)
+            versions = plan_versions(lengths, data_mode, ecl)
+            for length, version in zip(lengths, versions):
+                segments = [(data_mode, 'x' * length)]
+                bits = lambda v: segments_bit_length(segments, v)
+                if version == 0:
+                    assert bits(40) > max_databits(40, ecl)
+                    continue
+                assert bits(version) <= max_databits(version, ecl)
+                if version > 1:
+                    assert bits(version - 1) > max_databits(version - 1, ecl)
+    assert plan_versions([max_char_capacity('numeric', 9, 'H')], 'numeric',
+            'H').tolist() == [9]
+
+def test_plan_version_too_long():
+    from nose.tools import assert_raises
+    assert plan_version(23648, 'L') == 40
+    assert_raises(Exception, plan_version, 23649, 'L')
@@ -0,0 +1,31 @@
+import re
+from io import BytesIO
+
+from numpy import zeros
+
+from qrcode.qrcode import Encoder
+from qrcode.qrdraw import dark_modules, make_array
+from qrcode.svg import write_svg
+
+RECTANGLE = re.compile(r'([Mm])(-?\d+) (\d+)h(\d+)v1h-(\d+)z')
+
+
+def test_write_svg_matches_array():
+    symbol_array = make_array(Encoder('hello world', 'M'))
+    output = BytesIO()
+    write_svg(symbol_array, output, zoom=10, border=2)
+    svg = output.getvalue()
+    assert 'width="250" height="250" viewBox="0 0 25 25"' in svg
+    assert svg.count('<path') == 1
+    drawn = zeros((25, 25), dtype=bool)
+    x = y = 0
+    for move, dx, dy, length, back in RECTANGLE.findall(svg):
+        assert length == back
+        if move == 'M':
+            x, y = int(dx), int(dy)
+        else:
+            x += int(dx)
+        assert not drawn[y, x:x + int(length)].any()
+        drawn[y, x:x + int(length)] = True
+    assert (drawn[2:-2, 2:-2] == dark_modules(symbol_array)).all()
+    assert not drawn[:2].any() and not drawn[:, :2].any()
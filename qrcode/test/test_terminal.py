@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from io import BytesIO
+
+from qrcode.qrcode import Encoder
+from qrcode.terminal import (
+        ANSI_INVERSE,
+        ANSI_RESET,
+        ASCII_MODULES,
+        HALF_BLOCKS,
+        text_lines,
+        write_text)
+
+
+def test_text_lines_match_matrix():
+    matrix = Encoder('hello world', 'M').make_matrix()
+    lines = list(text_lines(matrix))
+    assert len(lines) == 15
+    assert all(len(line) == 29 for line in lines)
+    dark = matrix.dark()
+    for i in range(29):
+        for j in range(29):
+            code = HALF_BLOCKS.index(lines[i // 2][j])
+            module = code >> 1 if i % 2 == 0 else code & 1
+            inside = 4 <= i < 25 and 4 <= j < 25
+            assert module == (inside and dark[i - 4, j - 4])
+
+
+def test_text_lines_invert():
+    matrix = Encoder('HELLO', 'L').make_matrix()
+    lines = list(text_lines(matrix, border=1, invert=True))
+    assert lines[0][0] == lines[0][8] == u'█'
+    assert lines[1][1:8] == u' █▀▀▀█ '
+    assert lines[-1] == u'▀' * 23
+
+
+def test_write_text():
+    matrix = Encoder('HELLO', 'L').make_matrix()
+    output = BytesIO()
+    write_text(matrix, output, ansi=True)
+    lines = output.getvalue().decode('utf-8').splitlines()
+    assert len(lines) == 15
+    assert lines[0] == ANSI_INVERSE + u' ' * 29 + ANSI_RESET
+    assert lines[2][len(ANSI_INVERSE):].startswith(u'    █▀▀▀▀▀█ ')
+
+
+class AsciiStream(BytesIO):
+    encoding = 'ascii'
+
+
+def test_write_text_ascii():
+    matrix = Encoder('HELLO', 'L').make_matrix()
+    output = AsciiStream()
+    write_text(matrix, output, border=1)
+    lines = output.getvalue().decode('ascii').splitlines()
+    assert len(lines) == 23 and all(len(line) == 46 for line in lines)
+    assert lines[0] == u' ' * 46
+    assert lines[1] == u'  ' + u'#' * 14 + u'  ' + lines[1][18:]
+    dark = matrix.dark()
+    for i in range(21):
+        assert lines[i + 1][2:-2] == u''.join(ASCII_MODULES[module]
+                for module in dark[i])
@@ -1,15 +1,24 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from qrcode import Encoder
+from qrcode.qrcode import Encoder
+from qrcode.qrutils import reed_solomon
+
+BLOCK = [(x * 37 + 11) % 256 for x in range(118)]
 
 def benchmark():
-    Encoder('A'*937, 17, 'L', 'alphanumeric')
+    Encoder('A' * 937, 'L')
+
+def benchmark_reed_solomon():
+    reed_solomon(BLOCK, 30)
 
 def main():
     from timeit import Timer
     t = Timer('benchmark()', 'from __main__ import benchmark')
-    print t.timeit(100)
+    print "Encoder (version 17-L): %f" % t.timeit(100)
+    t = Timer('benchmark_reed_solomon()',
+            'from __main__ import benchmark_reed_solomon')
+    print "reed_solomon (118 + 30 codewords): %f" % t.timeit(1000)
 
 
 if __name__ == '__main__':